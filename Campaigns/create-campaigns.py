@@ -3,6 +3,11 @@ import json
 import logging
 from dotenv import load_dotenv
 import os
+import sys
+
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from remap_store import RemapStore
 
 # Load environment variables
 load_dotenv()
@@ -11,6 +16,8 @@ load_dotenv()
 API_KEY_NEW_INSTANCE = os.getenv('NP_API_KEY')  # Replace with your API key for the new HubSpot instance
 BASE_API_URL = 'https://api.hubapi.com/marketing/v3/campaigns/'
 JSON_FILE = 'campaigns_export.json'  # The JSON file containing the exported campaigns
+SOURCE_PORTAL = 'mip'  # Key of the exported portal in the ID remap store
+REMAP_DB = 'id_remap.db'  # Source campaign ID -> new campaign ID, read by later migration stages
 
 # Configure logging
 logging.basicConfig(
@@ -47,18 +54,23 @@ def create_campaign(campaign_data):
     if response.status_code == 201:
         logging.info(f"Successfully created campaign: {campaign_data.get('name')}")
         print(f"Successfully created campaign: {campaign_data.get('name')}")
+        return response.json()
     else:
         logging.error(f"Failed to create campaign: {campaign_data.get('name')} - {response.status_code} - {response.text}")
         print(f"Failed to create campaign: {campaign_data.get('name')} - {response.status_code} - {response.text}")
+        return None
 
 def main():
     # Load campaigns data from the JSON file
     with open(JSON_FILE, 'r') as jsonfile:
         campaigns_data = json.load(jsonfile)
     
-    # Iterate over each campaign and create it in the new instance
-    for campaign_data in campaigns_data:
-        create_campaign(campaign_data)
+    # Iterate over each campaign and create it in the new instance, recording each new ID
+    with RemapStore(REMAP_DB) as remap_store:
+        for campaign_data in campaigns_data:
+            created_campaign = create_campaign(campaign_data)
+            if created_campaign:
+                remap_store.record('campaign', SOURCE_PORTAL, campaign_data.get('id'), created_campaign.get('id'))
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,17 @@
+import copy
 import requests
 import json
 import logging
 from dotenv import load_dotenv
 import os
+import sys
+
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from payload_rules import load_rules, apply_rule
+from remap_store import RemapStore
+from target_schema import fetch_target_schema
+from payload_validation import validate_email, write_report
 
 # Load environment variables
 load_dotenv()
@@ -11,6 +20,12 @@ load_dotenv()
 API_KEY_NEW_INSTANCE = os.getenv('NP_API_KEY')  # Replace with your new HubSpot account API key
 BASE_API_URL = 'https://api.hubapi.com'  # Base URL for HubSpot API
 JSON_FILE = 'email_details.json'  # The file that contains exported email details
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules', 'mip-to-np.json')  # Cleaning rules for this portal pair
+SOURCE_PORTAL = 'mip'  # Key of the exported portal in the ID remap store
+TARGET_PORTAL = 'np'  # Key of the new instance in the shared schema cache
+REMAP_DB = 'id_remap.db'  # Source email ID -> new email ID, read by later migration stages
+DRY_RUN = '--dry-run' in sys.argv  # Validate the cleaned emails against the target schema without creating anything
+DRY_RUN_REPORT = 'dry_run_emails.csv'
 
 # Configure logging
 logging.basicConfig(
@@ -19,25 +34,8 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-# Function to clean up email data before importing to new instance
-def clean_email_data(email_data):
-    # Remove fields that shouldn't be present when creating a new email
-    fields_to_remove = [
-        'id', 'createdAt', 'updatedAt', 'archivedAt', 'publishedAt', 'status', 
-        'appId', 'processingStatus', 'subscription', 'subscriptionName',  # Remove subscription and subscriptionName
-        'businessUnitId'  # Remove businessUnitId as well
-    ]
-    
-    for field in fields_to_remove:
-        email_data.pop(field, None)
-    
-    # Set the state to DRAFT to avoid issues with the email being published
-    email_data['state'] = 'DRAFT'
-    
-    return email_data
-
 # Function to create a new email in the new HubSpot instance using legacy API endpoint
-def create_email(email_data):
+def create_email(email_data, rules):
     # Using the legacy API endpoint
     url = f'{BASE_API_URL}/marketing-emails/v1/emails/'
     headers = {
@@ -45,8 +43,8 @@ def create_email(email_data):
         'Content-Type': 'application/json'
     }
     
-    # Clean email data
-    email_data = clean_email_data(email_data)
+    # Clean email data; the rules drop source-only fields and set the state to DRAFT
+    email_data = apply_rule(email_data, rules)
     
     # Log cleaned data before making the request
     logging.debug(f"Creating email with the following data: {json.dumps(email_data, indent=4)}")
@@ -65,13 +63,27 @@ def create_email(email_data):
         return None
 
 def main():
+    # Compile the cleaning rules once for all emails
+    rules = load_rules(RULES_FILE)
+
     # Load email data from JSON file
     with open(JSON_FILE, 'r') as f:
         emails = json.load(f)
     
+    # With --dry-run, check the cleaned payloads locally and stop before any write call
+    if DRY_RUN:
+        schema = fetch_target_schema(API_KEY_NEW_INSTANCE, TARGET_PORTAL)
+        cleaned_emails = [apply_rule(copy.deepcopy(email_data), rules) for email_data in emails]
+        write_report([('email', email.get('name', 'Unnamed Email'), validate_email(email, schema)) for email in cleaned_emails if email], DRY_RUN_REPORT)
+        return
+
     # Iterate over each email in the JSON file and create it in the new instance
-    for email_data in emails:
-        create_email(email_data)
+    with RemapStore(REMAP_DB) as remap_store:
+        for email_data in emails:
+            source_id = email_data.get('id')  # Read before cleaning, which removes it
+            created_email = create_email(email_data, rules)
+            if created_email:
+                remap_store.record('email', SOURCE_PORTAL, source_id, created_email.get('id'))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
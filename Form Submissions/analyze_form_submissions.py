@@ -0,0 +1,48 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import logging
+
+# Constants
+ARCHIVE_DIR = 'form_submissions_archive'  # Dataset written by archive_form_submissions.py
+BASE_URLS_CSV = 'form_base_urls_summary.csv'  # One row per form and base URL
+FORM_COUNTS_CSV = 'form_submission_counts.csv'  # One row per form
+
+# Configure logging
+logging.basicConfig(
+    filename='analyze_form_submissions.log',
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Function to load the columns needed for URL analytics from the archive
+def load_submissions(archive_dir):
+    dataset = ds.dataset(archive_dir, format='parquet', partitioning='hive')
+    # Only the columns used below are read; the submitted values stay on disk
+    table = dataset.to_table(columns=['form_id', 'submitted_at', 'page_url'])
+    return table.set_column(0, 'form_id', pc.cast(table['form_id'], pa.string()))
+
+def main():
+    submissions = load_submissions(ARCHIVE_DIR)
+    logging.info(f"Loaded {submissions.num_rows} submissions from {ARCHIVE_DIR}")
+
+    # Base URL is the page URL up to the query string, computed over the whole column at once
+    base_url = pc.replace_substring_regex(submissions['page_url'], pattern=r'\?.*$', replacement='')
+    with_urls = submissions.append_column('base_url', base_url).filter(pc.not_equal(base_url, ''))  # Drops missing and empty URLs
+
+    base_url_summary = with_urls.group_by(['form_id', 'base_url']).aggregate([
+        ('submitted_at', 'count'), ('submitted_at', 'min'), ('submitted_at', 'max')
+    ]).rename_columns(['form_id', 'base_url', 'submissions', 'first_seen', 'last_seen'])
+
+    form_counts = submissions.group_by('form_id').aggregate([
+        ('submitted_at', 'count'), ('submitted_at', 'min'), ('submitted_at', 'max')
+    ]).rename_columns(['form_id', 'submissions', 'first_seen', 'last_seen'])
+
+    base_url_summary.to_pandas().sort_values(['form_id', 'first_seen']).to_csv(BASE_URLS_CSV, index=False)
+    form_counts.to_pandas().sort_values('form_id').to_csv(FORM_COUNTS_CSV, index=False)
+
+    logging.info(f"Data saved to {BASE_URLS_CSV} and {FORM_COUNTS_CSV}")
+    print(f"{form_counts.num_rows} forms and {base_url_summary.num_rows} form/base URL pairs saved to {BASE_URLS_CSV} and {FORM_COUNTS_CSV}")
+
+if __name__ == "__main__":
+    main()
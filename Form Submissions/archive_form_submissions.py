@@ -0,0 +1,119 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import logging
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+import os
+
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from hubspot_http import get_session, request_with_retries
+
+# Constants
+load_dotenv()  # Load environment variables from .env file
+API_KEY = os.getenv('GS_API_KEY')  # Replace with the API key of the portal to archive
+BASE_API_URL = 'https://api.hubapi.com/form-integrations/v1/submissions/forms/'  # Base URL for HubSpot form submissions API
+FORM_IDS_CSV = 'form_ids.csv'  # CSV with a "Form ID" column
+ARCHIVE_DIR = 'form_submissions_archive'  # Parquet dataset, partitioned as form_id=<id>/part-<n>.parquet
+PAGE_LIMIT = 50  # Largest page size the submissions endpoint accepts
+ROWS_PER_FILE = 50000  # Submissions buffered before a Parquet file is written
+FORM_WORKERS = 8  # Number of forms archived concurrently
+
+# Configure logging
+logging.basicConfig(
+    filename='archive_form_submissions.log',
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# The form ID is carried by the partition directory, so it is not repeated in every file
+SUBMISSION_SCHEMA = pa.schema([
+    ('submitted_at', pa.timestamp('ms', tz='UTC')),
+    ('page_url', pa.string()),
+    ('values', pa.list_(pa.struct([('name', pa.string()), ('value', pa.string())]))),
+])
+
+# Generator that pages through every submission of a form, newest first
+def iter_submissions(form_id):
+    session = get_session(API_KEY)
+    url = f"{BASE_API_URL}{form_id}"
+    params = {'limit': PAGE_LIMIT}
+
+    while True:
+        response = request_with_retries(session, 'GET', url, params=params)
+        if response.status_code != 200:
+            raise Exception(f"Error fetching submissions for form {form_id}: {response.status_code} - {response.text}")
+
+        data = response.json()
+        yield from data.get('results', [])
+
+        after = data.get('paging', {}).get('next', {}).get('after')
+        if not after:
+            return
+        params = {'limit': PAGE_LIMIT, 'after': after}
+
+# Function to write one buffered batch of submissions as a Parquet file in the form's partition
+def write_batch(form_dir, part_number, batch):
+    table = pa.Table.from_pydict(batch, schema=SUBMISSION_SCHEMA)
+    pq.write_table(table, os.path.join(form_dir, f"part-{part_number:05d}.parquet"), compression='zstd')
+
+# Function to stream all submissions of a form into its partition of the dataset
+def archive_form(form_id):
+    form_dir = os.path.join(ARCHIVE_DIR, f"form_id={form_id}")
+    temp_dir = form_dir + '.tmp'
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+
+    batch = {'submitted_at': [], 'page_url': [], 'values': []}
+    part_number = 0
+    total = 0
+
+    try:
+        for submission in iter_submissions(form_id):
+            batch['submitted_at'].append(submission.get('submittedAt'))
+            batch['page_url'].append(submission.get('pageUrl'))
+            batch['values'].append([
+                {'name': value.get('name'), 'value': None if value.get('value') is None else str(value.get('value'))}
+                for value in submission.get('values', [])
+            ])
+
+            if len(batch['page_url']) >= ROWS_PER_FILE:
+                write_batch(temp_dir, part_number, batch)
+                total += len(batch['page_url'])
+                part_number += 1
+                batch = {'submitted_at': [], 'page_url': [], 'values': []}
+
+        if batch['page_url']:
+            write_batch(temp_dir, part_number, batch)
+            total += len(batch['page_url'])
+    except Exception as e:
+        # Keep the previous archive of this form rather than replacing it with a partial one
+        logging.error(f"Archiving form {form_id} failed, previous archive kept: {e}")
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return form_id, None
+
+    # Swap the new partition in only once the whole form has been crawled
+    shutil.rmtree(form_dir, ignore_errors=True)
+    os.rename(temp_dir, form_dir)
+    logging.info(f"Archived {total} submissions for form {form_id}")
+    return form_id, total
+
+def main():
+    df_form_ids = pd.read_csv(FORM_IDS_CSV)  # Assuming CSV has a column "Form ID"
+    form_ids = df_form_ids['Form ID'].astype(str).tolist()
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=FORM_WORKERS) as executor:
+        results = list(executor.map(archive_form, form_ids))
+
+    archived = sum(total for _, total in results if total is not None)
+    failed = [form_id for form_id, total in results if total is None]
+    print(f"Archived {archived} submissions from {len(form_ids) - len(failed)} forms to {ARCHIVE_DIR}, {len(failed)} forms failed.")
+    for form_id in failed:
+        print(f"  Failed: {form_id}")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,26 @@
 import requests
 import pandas as pd
-from urllib.parse import urljoin
+import json
 import logging
 import re  # Import regex library for extracting form ID
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import os
 
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from hubspot_http import get_session, request_with_retries
+
 # Constants
 load_dotenv()  # Load environment variables from .env file
 API_KEY = os.getenv('MIP_API_KEY')  # Replace with your actual API key
 BASE_API_URL = 'https://api.hubapi.com/form-integrations/v1/submissions/forms/'  # Base URL for HubSpot form submissions API
-LIMIT50 = '?limit=50'
+PAGE_LIMIT = 50  # Largest page size the submissions endpoint accepts
+FORM_WORKERS = 8  # Number of forms crawled concurrently
+OUTPUT_CSV = 'mip_form_base_urls_with_ids.csv'  # Base URLs found per form
+STATE_FILE = 'mip_form_submissions_state.json'  # Newest submittedAt seen per form
+INCREMENTAL = False  # True to stop each form at its stored watermark and merge new base URLs into OUTPUT_CSV
 
 # Configure logging
 logging.basicConfig(
@@ -27,79 +37,119 @@ def extract_form_id(form_url):
     match = re.search(r'/forms/([^?]+)', form_url)
     return match.group(1) if match else None
 
-def fetch_submissions(url, form_url):
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {API_KEY}'
-    }
-    
-    base_urls = []  # List to store base URLs for the current form
-    
-    while url:
-        logging.debug(f"Fetching URL: {url}")  # Log URL being fetched
-        
-        response = requests.get(url, headers=headers)
-        
+# Generator that pages through every submission of a form, newest first
+def iter_submissions(form_id):
+    session = get_session(API_KEY)
+    url = f"{BASE_API_URL}{form_id}"
+    params = {'limit': PAGE_LIMIT}
+
+    while True:
+        logging.debug(f"Fetching URL: {url} with {params}")  # Log URL being fetched
+
+        response = request_with_retries(session, 'GET', url, params=params)
+
         # Check for HTTP errors
         if response.status_code != 200:
-            logging.error(f"Error fetching data: {response.status_code} - {response.text}")
-            break
-        
+            raise Exception(f"Error fetching data: {response.status_code} - {response.text}")
+
         try:
             data = response.json()  # Attempt to parse JSON
         except requests.exceptions.JSONDecodeError:
-            logging.error(f"Failed to parse JSON response from {url}. Response text: {response.text}")
-            break
-        
-        if 'results' in data:
-            logging.debug(f"Number of results on this page: {len(data['results'])}")  # Log number of results
-            
-            for submission in data['results']:
-                page_url = submission.get('pageUrl')  # Safely get 'pageUrl'
-                if page_url:  # Only process if 'pageUrl' is not None
-                    base_url = get_base_url(page_url)
-                    if base_url:
-                        if base_url not in base_urls:
-                            logging.info(f"New base URL found: {base_url}")  # Log new base URLs
-                            base_urls.append(base_url)  # Add base URL to the list
-        
-        # Handle pagination
-        if 'paging' in data and 'next' in data['paging']:
-            next_link = data['paging']['next']['link']
-            # Ensure the next link is correctly appended to the form URL
-            if next_link.startswith('/'):
-                url = urljoin(form_url, next_link, LIMIT50)
-            else:
-                url = urljoin(form_url, next_link, LIMIT50)
-            logging.debug(f"Next page URL: {url}")  # Log next page URL
-        else:
-            url = None
-    
-    return base_urls
+            raise Exception(f"Failed to parse JSON response from {url}. Response text: {response.text}")
+
+        results = data.get('results', [])
+        logging.debug(f"Number of results on this page: {len(results)}")  # Log number of results
+        yield from results
+
+        # Handle pagination; the page size has to be sent again with every 'after' token
+        after = data.get('paging', {}).get('next', {}).get('after')
+        if not after:
+            return
+        params = {'limit': PAGE_LIMIT, 'after': after}
+
+def fetch_submissions(form_id, watermark=None):
+    """Collect the base URLs of a form's submissions newer than the watermark (all of them if None).
+
+    Returns the base URLs in first-seen order and the newest submittedAt seen, or None as the
+    second value if the crawl failed part way, so the stored watermark is not moved past missed pages.
+    """
+    # Dict keys keep first-seen order with constant-time membership checks
+    base_urls = {}
+    newest_submitted_at = watermark
+
+    try:
+        for submission in iter_submissions(form_id):
+            submitted_at = submission.get('submittedAt')
+
+            # Submissions come back newest first, so everything from here on was seen in an earlier run
+            if watermark is not None and submitted_at is not None and submitted_at < watermark:
+                break
+            if submitted_at is not None and (newest_submitted_at is None or submitted_at > newest_submitted_at):
+                newest_submitted_at = submitted_at
+
+            base_url = get_base_url(submission.get('pageUrl'))  # Safely get 'pageUrl'
+            if base_url and base_url not in base_urls:
+                logging.info(f"New base URL found: {base_url}")  # Log new base URLs
+                base_urls[base_url] = None
+    except Exception as e:
+        logging.error(f"Error fetching submissions for form ID {form_id}: {e}")
+        return list(base_urls), None
+
+    return list(base_urls), newest_submitted_at
+
+# Function to load the per-form submittedAt watermarks
+def load_state(state_file):
+    try:
+        with open(state_file, 'r') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+# Function to save the watermarks without leaving a half-written file behind
+def save_state(state, state_file):
+    temp_file = state_file + '.tmp'
+    with open(temp_file, 'w') as file:
+        json.dump(state, file, indent=4)
+    os.replace(temp_file, state_file)
 
 def main():
     # Load form IDs from CSV file
     df_form_ids = pd.read_csv('mip_form_ids.csv')  # Assuming CSV has a column "Form ID"
     form_ids = df_form_ids['Form ID'].tolist()  # Extract form IDs from CSV
     
+    form_ids = [str(form_id) for form_id in form_ids]
+    state = load_state(STATE_FILE)
     all_results = []  # List to store results
-    
-    for form_id in form_ids:
-        form_url = f"{BASE_API_URL}{form_id}{LIMIT50}"  # Construct the full form URL
-        logging.info(f"Processing form ID: {form_id}, URL: {form_url}")  # Log the form ID and URL being processed
-        
-        submission_urls = fetch_submissions(form_url, form_url)
-        
-        if submission_urls:
-            for base_url in submission_urls:
-                all_results.append((form_url, base_url, form_id))  # Add form ID to results
-        else:
-            logging.info(f"No submission URLs found for form ID: {form_id}")  # Log if no URLs are found
+
+    # Crawl several forms at once; results come back in the order of the CSV
+    with ThreadPoolExecutor(max_workers=FORM_WORKERS) as executor:
+        watermarks = [state.get(form_id) if INCREMENTAL else None for form_id in form_ids]
+        form_results = executor.map(fetch_submissions, form_ids, watermarks)
+
+        for form_id, (submission_urls, newest_submitted_at) in zip(form_ids, form_results):
+            form_url = f"{BASE_API_URL}{form_id}?limit={PAGE_LIMIT}"  # Construct the full form URL
+            logging.info(f"Processed form ID: {form_id}, URL: {form_url}")  # Log the form ID and URL processed
+
+            if newest_submitted_at is not None:
+                state[form_id] = newest_submitted_at
+
+            if submission_urls:
+                for base_url in submission_urls:
+                    all_results.append((form_url, base_url, form_id))  # Add form ID to results
+            else:
+                logging.info(f"No new submission URLs found for form ID: {form_id}")  # Log if no URLs are found
     
     # Convert the list to a DataFrame with 'Form URL', 'Base URL', and 'Form ID' columns
     df = pd.DataFrame(all_results, columns=['Form URL', 'Base URL', 'Form ID'])
-    df.to_csv('mip_form_base_urls_with_ids.csv', index=False)
-    logging.info("Data saved to mip_form_base_urls_with_ids.csv")
+
+    # In incremental mode only new submissions were read, so merge them into the previous results
+    if INCREMENTAL and os.path.exists(OUTPUT_CSV):
+        df_existing = pd.read_csv(OUTPUT_CSV, dtype=str)
+        df = pd.concat([df_existing, df], ignore_index=True).drop_duplicates(subset=['Form ID', 'Base URL'], keep='first')
+
+    df.to_csv(OUTPUT_CSV, index=False)
+    save_state(state, STATE_FILE)
+    logging.info(f"Data saved to {OUTPUT_CSV}, watermarks saved to {STATE_FILE}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,13 +1,19 @@
-import requests
 import pandas as pd
 import logging
+import sys
 from dotenv import load_dotenv
 import os
 
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from hubspot_http import get_session, request_with_retries
+
 # Constants
 load_dotenv()  # Load environment variables from .env file
 API_KEY = os.getenv('MIP_API_KEY')  # Replace with your actual API key
 BASE_API_URL = 'https://api.hubapi.com/marketing/v3/forms/'  # Base URL for HubSpot Forms API
+CATALOG_PAGE_LIMIT = 500  # Largest page size the forms list endpoint accepts
+CATALOG_MODE = True  # Build the id index from one paged list of all forms; False fetches every form by ID
 
 # Configure logging
 logging.basicConfig(
@@ -18,45 +24,75 @@ logging.basicConfig(
 
 def fetch_form_details(form_id):
     """
-    Fetch the form details, including name, form ID, and updatedAt.
+    Fetch the form details, including name, form ID, updatedAt and form type.
     """
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {API_KEY}'
-    }
-    
+    session = get_session(API_KEY)
     form_url = f"{BASE_API_URL}{form_id}"
     logging.debug(f"Fetching form details for form ID: {form_id}")
     
-    response = requests.get(form_url, headers=headers)
+    response = request_with_retries(session, 'GET', form_url)
     
     if response.status_code == 200:
         data = response.json()
         form_name = data.get('name')
         updated_at = data.get('updatedAt')
-        return form_id, form_name, updated_at
+        form_type = data.get('formType')
+        return form_id, form_name, updated_at, form_type
     else:
         logging.error(f"Failed to fetch form details for {form_id}: {response.status_code} - {response.text}")
-        return form_id, None, None
+        return form_id, None, None, None
+
+def fetch_form_catalog():
+    """
+    Page through every form in the portal once and index them as id -> (name, updatedAt, formType).
+    """
+    session = get_session(API_KEY)
+    params = {'limit': CATALOG_PAGE_LIMIT, 'formTypes': 'all'}
+    catalog = {}
+
+    while True:
+        response = request_with_retries(session, 'GET', BASE_API_URL, params=params)
+        if response.status_code != 200:
+            logging.error(f"Failed to list forms: {response.status_code} - {response.text}")
+            break
+
+        data = response.json()
+        for form in data.get('results', []):
+            catalog[form.get('id')] = (form.get('name'), form.get('updatedAt'), form.get('formType'))
+        logging.debug(f"Form catalog now holds {len(catalog)} forms")
+
+        after = data.get('paging', {}).get('next', {}).get('after')
+        if not after:
+            break
+        params['after'] = after
+
+    logging.info(f"Loaded {len(catalog)} forms into the catalog")
+    return catalog
 
 def main():
     # Load form IDs from CSV file
     df_form_ids = pd.read_csv('mip_form_ids.csv')  # Assuming CSV has a column "Form ID"
     form_ids = df_form_ids['Form ID'].tolist()  # Extract form IDs from CSV
+
+    catalog = fetch_form_catalog() if CATALOG_MODE else {}
     
-    all_results = []  # List to store results (form_id, form_name, updated_at)
+    all_results = []  # List to store results (form_id, form_name, updated_at, form_type)
     
     for form_id in form_ids:
         logging.info(f"Processing form ID: {form_id}")
-        form_id, form_name, updated_at = fetch_form_details(form_id)
+        if str(form_id) in catalog:
+            form_name, updated_at, form_type = catalog[str(form_id)]
+        else:
+            # Archived forms aren't in the list, so anything the catalog misses is fetched by ID
+            form_id, form_name, updated_at, form_type = fetch_form_details(form_id)
         
         if form_name:
-            all_results.append((form_id, form_name, updated_at))  # Add form ID, form name, and updatedAt to results
+            all_results.append((form_id, form_name, updated_at, form_type))  # Add form ID, form name, updatedAt and type to results
         else:
             logging.info(f"No form name found for form ID: {form_id}")
     
-    # Convert the list to a DataFrame with 'Form ID', 'Form Name', and 'Updated At' columns
-    df = pd.DataFrame(all_results, columns=['Form ID', 'Form Name', 'Updated At'])
+    # Convert the list to a DataFrame with 'Form ID', 'Form Name', 'Updated At' and 'Form Type' columns
+    df = pd.DataFrame(all_results, columns=['Form ID', 'Form Name', 'Updated At', 'Form Type'])
     
     # Save to CSV
     df.to_csv('gs_form_ids_names_and_updated_at.csv', index=False)
@@ -4,6 +4,14 @@ import json
 import csv
 from dotenv import load_dotenv
 import os
+import sys
+
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from buffered_csv import BufferedCsvWriter
+from hubspot_http import get_session
+from schema_cache import SchemaCache
+from target_schema import fetch_all_results
 
 # Loads the .env file into the system environment
 load_dotenv()
@@ -14,6 +22,7 @@ BASE_API_URL = 'https://api.hubapi.com'  # Base URL for HubSpot API
 CSV_FILE = 'mip_form_id.csv'  # Path to the CSV file containing form IDs
 OUTPUT_CSV = 'mip_form_fields.csv'  # Output CSV file for form fields
 OUTPUT_JSON = 'mip_form_details.json'  # Output JSON file for full form details
+PORTAL = 'mip'  # Key of this portal in the shared schema cache
 
 # Configure logging
 logging.basicConfig(
@@ -62,6 +71,15 @@ def fetch_form_details(form_id):
     logging.debug(f"Form {form_id} fetched successfully")
     return data
 
+# Function to map every form ID to its updatedAt with one paged list call, so unchanged forms come from the cache
+def fetch_form_versions():
+    try:
+        forms = fetch_all_results(get_session(API_KEY), '/marketing/v3/forms', {'limit': 500, 'formTypes': 'all'})
+    except Exception as e:
+        logging.error(f"Could not list forms, fetching every form: {e}")
+        return {}
+    return {str(form['id']): form.get('updatedAt') for form in forms}
+
 # Function to extract field names from form data
 def extract_field_names(form_data):
     fields = []
@@ -71,14 +89,11 @@ def extract_field_names(form_data):
                 fields.append(field.get('name', 'Unknown'))  # Get field name or 'Unknown' if not present
     return fields
 
-# Function to write field names to CSV
-def write_fields_to_csv(form_id, field_names, output_csv):
+# Function to write field names to CSV through the run's shared buffered writer
+def write_fields_to_csv(form_id, field_names, field_writer):
     try:
-        with open(output_csv, 'a', newline='') as file:
-            writer = csv.writer(file)
-            for field_name in field_names:
-                writer.writerow([form_id, field_name])
-        logging.info(f"Field names for form {form_id} written to {output_csv}")
+        field_writer.write_rows([form_id, field_name] for field_name in field_names)
+        logging.info(f"Field names for form {form_id} queued for {OUTPUT_CSV}")
     except Exception as e:
         logging.error(f"Error writing to CSV: {e}")
 
@@ -93,29 +108,31 @@ def write_form_details_to_json(form_data_list, output_json):
         logging.error(f"Error writing to JSON: {e}")
 
 def main():
-    # Initialize the output CSV with headers
-    with open(OUTPUT_CSV, 'w', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow(['form_id', 'field_name'])
-
-    form_ids = fetch_form_ids_from_csv(CSV_FILE)  # Get form IDs from the CSV file
-
-    if not form_ids:
-        logging.error("No form IDs found in CSV. Exiting.")
-        return
-
-    form_data_list = []  # List to hold all form data
-
-    for form_id in form_ids:
-        logging.info(f"Processing form ID: {form_id}")  # Log the form ID being processed
-        form_data = fetch_form_details(form_id)
-
-        if form_data:
-            field_names = extract_field_names(form_data)  # Extract field names from form data
-            write_fields_to_csv(form_id, field_names, OUTPUT_CSV)  # Write the field names to the CSV
-            form_data_list.append(form_data)  # Add form data to the list
-        else:
-            logging.info(f"No data found for form ID: {form_id}")
+    # One handle for the whole run; the header is written when it opens, as before
+    with BufferedCsvWriter(OUTPUT_CSV, header=['form_id', 'field_name']) as field_writer:
+        form_ids = fetch_form_ids_from_csv(CSV_FILE)  # Get form IDs from the CSV file
+
+        if not form_ids:
+            logging.error("No form IDs found in CSV. Exiting.")
+            return
+
+        form_data_list = []  # List to hold all form data
+        cache = SchemaCache(PORTAL, API_KEY)
+        form_versions = fetch_form_versions()
+
+        for form_id in form_ids:
+            logging.info(f"Processing form ID: {form_id}")  # Log the form ID being processed
+            form_data = cache.get_item('forms', form_id, form_versions.get(form_id), fetch_form_details)
+
+            if form_data:
+                field_names = extract_field_names(form_data)  # Extract field names from form data
+                write_fields_to_csv(form_id, field_names, field_writer)  # Write the field names to the CSV
+                form_data_list.append(form_data)  # Add form data to the list
+            else:
+                logging.info(f"No data found for form ID: {form_id}")
+
+    cache.save()
+    logging.info(f"All field names written to {OUTPUT_CSV} ({cache.summary()})")
 
     # Write all form data to JSON file as a valid array
     write_form_details_to_json(form_data_list, OUTPUT_JSON)
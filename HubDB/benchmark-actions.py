@@ -0,0 +1,208 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import re
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from requests.adapters import HTTPAdapter
+
+# Custom-code action files to benchmark, relative to the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ACTION_FILES = [
+    'HubDB/forms-workflow.py',
+    'HubDB/verify-form-submissions.py',
+    'Workflows/forms-hubdb.py',
+]
+HUBSPOT_API_BASE = 'https://api.hubapi.com'
+
+# Stub of the HubSpot endpoints the actions call, with synthetic forms and HubDB rows
+class StubHubSpot:
+    def __init__(self, form_count, hubdb_row_count, latency_ms, seed=0):
+        self.latency = latency_ms / 1000
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+        rng = random.Random(seed)
+        self.forms = [
+            {
+                'guid': f"{rng.getrandbits(32):08x}-{index:04x}-4000-8000-{rng.getrandbits(48):012x}",
+                'name': f"Benchmark Form {index}",
+                'portalId': 1234567,
+                'submitText': 'Submit',
+                'formFieldGroups': [
+                    {'fields': [{'name': 'email', 'label': 'Email', 'type': 'string', 'fieldType': 'text'}]}
+                ],
+            }
+            for index in range(form_count)
+        ]
+
+        cmo_sources = ['demo_request', 'contact_us', 'webinar', 'content_download']
+        self.hubdb_rows = []
+        for index in range(hubdb_row_count):
+            # Rows beyond the form count point at forms that no longer exist, as in real tables
+            form_id = self.forms[index]['guid'] if index < form_count else f"retired-form-{index}"
+            cmo_source = cmo_sources[index % len(cmo_sources)]
+            self.hubdb_rows.append({
+                'id': str(100000 + index),
+                'values': {
+                    'form_id': form_id,
+                    'cmo_source': {'id': index % len(cmo_sources) + 1, 'name': cmo_source,
+                                   'label': cmo_source.replace('_', ' ').title(), 'type': 'option'},
+                },
+            })
+
+        # Only forms with a HubDB row can be looked up; events are drawn from these
+        self.linked_forms = self.forms[:hubdb_row_count]
+
+        self.forms_body = json.dumps(self.forms).encode()
+        self.hubdb_body = json.dumps({'total': len(self.hubdb_rows), 'results': self.hubdb_rows}).encode()
+
+    def handle(self, method, path):
+        with self.lock:
+            self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        path = path.split('?')[0]
+        if method == 'GET' and path == '/forms/v2/forms':
+            return 200, self.forms_body
+        if method == 'GET' and re.fullmatch(r'/cms/v3/hubdb/tables/[^/]+/rows', path):
+            return 200, self.hubdb_body
+
+        contact = re.fullmatch(r'/crm/v3/objects/contacts/([^/]+)', path)
+        if contact and method in ('GET', 'PATCH'):
+            body = {'id': contact.group(1), 'properties': {'phone': '+1 555 0100'}}
+            return 200, json.dumps(body).encode()
+
+        return 404, json.dumps({'status': 'error', 'message': f"No stub for {method} {path}"}).encode()
+
+# Function to start the stub server on a free local port
+def start_stub_server(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive, so pooled sessions behave as they do against HubSpot
+        disable_nagle_algorithm = True  # Headers and body are separate writes; avoid delayed-ACK stalls
+
+        def respond(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                self.rfile.read(length)
+            status, body = stub.handle(self.command, self.path)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = respond
+        do_PATCH = respond
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# Transport adapter that sends requests meant for api.hubapi.com to the stub server instead
+class StubRedirectAdapter(HTTPAdapter):
+    def __init__(self, stub_base_url):
+        super().__init__()
+        self.stub_base_url = stub_base_url
+
+    def send(self, request, **kwargs):
+        request.url = request.url.replace(HUBSPOT_API_BASE, self.stub_base_url, 1)
+        return super().send(request, **kwargs)
+
+# Function to load a fresh copy of an action module, as a cold custom-code container would
+def load_action(path, stub_base_url):
+    spec = importlib.util.spec_from_file_location('action', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.session.mount(HUBSPOT_API_BASE, StubRedirectAdapter(stub_base_url))
+    return module
+
+# Function to build a synthetic enrollment event for one of the stub's forms that has a HubDB row
+def build_event(stub, rng):
+    form = rng.choice(stub.linked_forms)
+    return {
+        'object': {'objectId': rng.randint(1, 10**9), 'objectType': 'CONTACT'},
+        'inputFields': {
+            'email': f"bench{rng.randint(1, 10**6)}@example.com",
+            'recent_conversion_event_name': form['name'],
+        },
+    }
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+# Function to run a batch of events and collect per-event latency and HTTP call counts
+def run_events(stub, action_path, stub_base_url, events, cold):
+    latencies = []
+    calls = []
+    module = None if cold else load_action(action_path, stub_base_url)
+
+    for event in events:
+        start_count = stub.request_count
+        start = time.perf_counter()
+        if cold:
+            # Cold runs include loading the module and opening a new connection
+            module = load_action(action_path, stub_base_url)
+        with contextlib.redirect_stdout(io.StringIO()):  # Keep the actions' prints out of the report
+            result = module.main(event)
+        latencies.append((time.perf_counter() - start) * 1000)
+        calls.append(stub.request_count - start_count)
+
+        if 'error' in result.get('outputFields', {}):
+            raise RuntimeError(f"{action_path} returned an error: {result['outputFields']['error']}")
+
+    return latencies, calls
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark custom-code action main(event) against a stub HubSpot server.')
+    parser.add_argument('--forms', type=int, default=500, help='Number of forms returned by /forms/v2/forms')
+    parser.add_argument('--hubdb-rows', type=int, default=500, help='Number of rows in the HubDB lookup table')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latency added by the stub to every request')
+    parser.add_argument('--events', type=int, default=200, help='Warm events replayed per action')
+    parser.add_argument('--cold-events', type=int, default=50, help='Cold events replayed per action')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data and events')
+    args = parser.parse_args()
+    if min(args.forms, args.hubdb_rows) < 1:
+        parser.error('--forms and --hubdb-rows must both be at least 1, so every event has a form with a HubDB row')
+
+    stub = StubHubSpot(args.forms, args.hubdb_rows, args.latency_ms, args.seed)
+    server = start_stub_server(stub)
+    stub_base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # The actions read their token from the custom-code secret
+    os.environ.setdefault('secretApp', 'benchmark-token')
+
+    print(f"Stub: {args.forms} forms, {args.hubdb_rows} HubDB rows, {args.latency_ms} ms latency per request")
+    print(f"{'Action':<34}{'Mode':<6}{'Events':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'Calls/event':>13}")
+
+    try:
+        for relative_path in ACTION_FILES:
+            action_path = os.path.join(REPO_ROOT, relative_path)
+            for mode, count in (('cold', args.cold_events), ('warm', args.events)):
+                if count <= 0:
+                    continue
+                rng = random.Random(args.seed)
+                events = [build_event(stub, rng) for _ in range(count)]
+                latencies, calls = run_events(stub, action_path, stub_base_url, events, cold=(mode == 'cold'))
+                print(
+                    f"{relative_path:<34}{mode:<6}{len(latencies):>7}"
+                    f"{percentile(latencies, 50):>9.2f}{percentile(latencies, 95):>9.2f}{percentile(latencies, 99):>9.2f}"
+                    f"{statistics.mean(calls):>13.2f}"
+                )
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
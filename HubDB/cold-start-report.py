@@ -0,0 +1,69 @@
+import subprocess
+import sys
+import json
+import os
+
+# Custom-code action files to measure, relative to the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ACTION_FILES = [
+    'HubDB/forms-workflow.py',
+    'HubDB/verify-form-submissions.py',
+    'Workflows/forms-hubdb.py',
+]
+RUNS = 5  # Number of fresh interpreters to start per action
+
+# Code run inside a fresh interpreter: load the action module and report time and memory
+PROBE = '''
+import importlib.util, json, resource, sys, time
+start = time.perf_counter()
+target = sys.argv[1]
+if target.endswith('.py'):
+    spec = importlib.util.spec_from_file_location('action', target)
+    spec.loader.exec_module(importlib.util.module_from_spec(spec))
+else:
+    exec(target)
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({
+    'import_ms': elapsed_ms,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+'''
+
+# Reference point: a bare interpreter with nothing imported
+EMPTY_BASELINE = "pass"
+
+# Baseline: what the actions used to load before the SDK was dropped
+SDK_BASELINE = (
+    "from hubspot import HubSpot\n"
+    "from hubspot.crm.contacts import ApiException, SimplePublicObjectInput\n"
+    "import requests\n"
+    "HubSpot(access_token='x').crm.contacts.basic_api"
+)
+
+# Function to measure one target in RUNS fresh interpreters
+def measure(target):
+    samples = []
+    for _ in range(RUNS):
+        result = subprocess.run([sys.executable, '-c', PROBE, target], capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"Failed to load {target}: {result.stderr.strip().splitlines()[-1]}")
+            return None
+        samples.append(json.loads(result.stdout))
+
+    # Report the median run so a single slow disk read doesn't skew the numbers
+    samples.sort(key=lambda sample: sample['import_ms'])
+    return samples[len(samples) // 2]
+
+def main():
+    targets = [(path, os.path.join(REPO_ROOT, path)) for path in ACTION_FILES]
+    targets.append(('hubspot SDK baseline', SDK_BASELINE))
+    targets.append(('empty interpreter', EMPTY_BASELINE))
+
+    print(f"{'Target':<36}{'Import (ms)':>12}{'Max RSS (KB)':>14}")
+    for label, target in targets:
+        sample = measure(target)
+        if sample:
+            print(f"{label:<36}{sample['import_ms']:>12.1f}{sample['max_rss_kb']:>14}")
+
+if __name__ == "__main__":
+    main()
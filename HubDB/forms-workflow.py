@@ -1,7 +1,46 @@
 import os
-from hubspot import HubSpot
-from hubspot.crm.contacts import ApiException, SimplePublicObjectInput
 import requests
+from requests.adapters import HTTPAdapter
+
+# The action only reads and updates contacts, so a pooled requests session is used
+# instead of the full hubspot SDK to keep the cold start of each enrollment short
+CONTACTS_API_URL = "https://api.hubapi.com/crm/v3/objects/contacts"
+
+# Module-level session so warm invocations reuse the open connection to api.hubapi.com
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+# Function to read contact properties by contact ID
+def get_contact_properties(access_token, contact_id, properties):
+    headers = {
+        'Authorization': f'Bearer {access_token}',
+        'Content-Type': 'application/json'
+    }
+
+    response = session.get(
+        f"{CONTACTS_API_URL}/{contact_id}",
+        headers=headers,
+        params={'properties': ','.join(properties)}
+    )
+    response.raise_for_status()
+
+    return response.json().get('properties', {})
+
+# Function to update contact properties by contact ID
+def update_contact_properties(access_token, contact_id, properties):
+    headers = {
+        'Authorization': f'Bearer {access_token}',
+        'Content-Type': 'application/json'
+    }
+
+    response = session.patch(
+        f"{CONTACTS_API_URL}/{contact_id}",
+        headers=headers,
+        json={'properties': properties}
+    )
+    response.raise_for_status()
+
+    return response.json()
 
 # Function to query HubDB and find the corresponding cmo_source label using form_id
 def get_cmo_source_label_from_hubdb(access_token, form_id):
@@ -14,7 +53,7 @@ def get_cmo_source_label_from_hubdb(access_token, form_id):
         'Content-Type': 'application/json'
     }
 
-    response = requests.get(hubdb_url, headers=headers)
+    response = session.get(hubdb_url, headers=headers)
 
     if response.status_code != 200:
         raise Exception(f"Failed to retrieve HubDB table. Status code: {response.status_code}")
@@ -36,15 +75,12 @@ def get_cmo_source_label_from_hubdb(access_token, form_id):
     return None  # Return None if no matching cmo_source is found
 
 # Function to update the contact's latest_cmo_source property in HubSpot
-def update_contact_property(hubspot, contact_id, latest_cmo_source):
-    # Prepare the contact update data
-    update_data = SimplePublicObjectInput(properties={"latest_cmo_source": latest_cmo_source})
-    
+def update_contact_property(access_token, contact_id, latest_cmo_source):
     try:
         # Update the contact in HubSpot
-        hubspot.crm.contacts.basic_api.update(contact_id, update_data)
+        update_contact_properties(access_token, contact_id, {"latest_cmo_source": latest_cmo_source})
         print(f"Successfully updated latest_cmo_source for contact {contact_id}")
-    except ApiException as e:
+    except requests.exceptions.RequestException as e:
         print(f"Error updating contact: {e}")
 
 def main(event):
@@ -58,16 +94,13 @@ def main(event):
             }
         }
 
-    # Instantiate HubSpot client with OAuth token
-    hubspot = HubSpot(access_token=access_token)
-
     phone = ''
     try:
         # Retrieve the contact's phone number using the contact ID from the event
         contact_id = event.get('object').get('objectId')
-        ApiResponse = hubspot.crm.contacts.basic_api.get_by_id(contact_id, properties=["phone"])
-        phone = ApiResponse.properties.get('phone')
-    except ApiException as e:
+        contact_properties = get_contact_properties(access_token, contact_id, ["phone"])
+        phone = contact_properties.get('phone')
+    except requests.exceptions.RequestException as e:
         print(f"Error fetching contact phone number: {e}")
         raise
 
@@ -90,7 +123,7 @@ def main(event):
 
     # Step 1: Get all forms from HubSpot Forms API using the token from secrets
     forms_url = "https://api.hubapi.com/forms/v2/forms"
-    response = requests.get(forms_url, headers=headers)
+    response = session.get(forms_url, headers=headers)
 
     if response.status_code != 200:
         return {
@@ -129,7 +162,7 @@ def main(event):
         }
 
     # Step 4: Update the contact's latest_cmo_source property with the label from cmo_source
-    update_contact_property(hubspot, contact_id, cmo_source_label)
+    update_contact_property(access_token, contact_id, cmo_source_label)
 
     # Return the email, phone, form ID, cmo_source label, and latest_cmo_source in the output fields
     return {
@@ -0,0 +1,44 @@
+import json
+import logging
+import os
+from dotenv import load_dotenv
+from hubdb_client import get_session, get_table, iter_rows
+
+# Loads the .env file into the system environment
+load_dotenv()
+
+# Constants
+API_KEY = os.getenv('GS_API_KEY')  # Replace with the API key of the portal that owns the table
+TABLE_ID_OR_NAME = 'cmo_source'  # HubDB table ID or name to export
+OUTPUT_FILE = 'hubdb_table_export.ndjson'  # One JSON object per line: the schema first, then one row per line
+
+# Configure logging
+logging.basicConfig(
+    filename='hubdb_export.log',
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    session = get_session(API_KEY)
+
+    table_data = get_table(session, TABLE_ID_OR_NAME)
+    if not table_data:
+        logging.error(f"HubDB table {TABLE_ID_OR_NAME} not found.")
+        print(f"HubDB table {TABLE_ID_OR_NAME} not found.")
+        return
+
+    row_count = 0
+    with open(OUTPUT_FILE, 'w') as output_file:
+        output_file.write(json.dumps({'type': 'schema', 'table': table_data}) + '\n')
+
+        # Rows are written as each page arrives, so large tables never sit in memory
+        for row in iter_rows(session, TABLE_ID_OR_NAME):
+            output_file.write(json.dumps({'type': 'row', 'row': row}) + '\n')
+            row_count += 1
+
+    logging.info(f"Exported {row_count} rows from HubDB table {TABLE_ID_OR_NAME} to {OUTPUT_FILE}")
+    print(f"Exported {row_count} rows from HubDB table {TABLE_ID_OR_NAME} to {OUTPUT_FILE}")
+
+if __name__ == "__main__":
+    main()
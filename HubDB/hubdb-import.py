@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+from dotenv import load_dotenv
+from hubdb_client import get_session, get_table, iter_rows, create_table, column_options, row_input, batch_rows, publish_table
+
+# Loads the .env file into the system environment
+load_dotenv()
+
+# Constants
+API_KEY_NEW_INSTANCE = os.getenv('NP_API_KEY')  # Replace with the API key of the target portal
+INPUT_FILE = 'hubdb_table_export.ndjson'  # File written by hubdb-export.py
+KEY_COLUMN = 'form_id'  # Column used to match rows when the table already exists in the target
+
+# Configure logging
+logging.basicConfig(
+    filename='hubdb_import.log',
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Function to read the table schema from the first line of the export
+def read_schema(input_file):
+    with open(input_file, 'r') as file:
+        record = json.loads(file.readline())
+    if record.get('type') != 'schema':
+        raise Exception(f"{input_file} does not start with a schema record.")
+    return record['table']
+
+# Generator that streams exported rows from the file one at a time
+def read_rows(input_file):
+    with open(input_file, 'r') as file:
+        for line in file:
+            record = json.loads(line)
+            if record.get('type') == 'row':
+                yield record['row']
+
+def main():
+    session = get_session(API_KEY_NEW_INSTANCE)
+    table_data = read_schema(INPUT_FILE)
+    table_name = table_data['name']
+
+    # Reuse the table if it already exists in the target, otherwise create it from the exported schema
+    target_table = get_table(session, table_name, draft=True)
+    existing_row_ids = {}
+
+    if target_table:
+        logging.info(f"HubDB table {table_name} already exists in the target (ID {target_table['id']}).")
+        for row in iter_rows(session, target_table['id'], draft=True):
+            key = row.get('values', {}).get(KEY_COLUMN)
+            if key is not None:
+                existing_row_ids[key] = row['id']
+        logging.info(f"Found {len(existing_row_ids)} existing rows keyed by {KEY_COLUMN}.")
+    else:
+        target_table = create_table(session, table_data)
+        logging.info(f"Created HubDB table {table_name} in the target (ID {target_table['id']}).")
+
+    table_id = target_table['id']
+    target_options = column_options(target_table)  # Option cells are matched to the target's options by name
+
+    # Rows not yet in the target are created, matching rows are updated in place
+    created, create_failures = batch_rows(session, table_id, 'create', (
+        row_input(row, target_options) for row in read_rows(INPUT_FILE)
+        if row.get('values', {}).get(KEY_COLUMN) not in existing_row_ids
+    ))
+
+    updated, update_failures = 0, 0
+    if existing_row_ids:
+        updated, update_failures = batch_rows(session, table_id, 'update', (
+            {'id': existing_row_ids[row['values'][KEY_COLUMN]], **row_input(row, target_options)}
+            for row in read_rows(INPUT_FILE)
+            if row.get('values', {}).get(KEY_COLUMN) in existing_row_ids
+        ))
+
+    # Publish once, after every row is in the draft; a partial draft stays unpublished for a rerun
+    failed = create_failures + update_failures
+    if failed:
+        logging.error(f"{failed} rows of {table_name} failed to import; the table was not published.")
+        print(f"{failed} rows of {table_name} failed to import; the table was not published. See hubdb_import.log.")
+        return
+    publish_table(session, table_id)
+
+    logging.info(f"Import of {table_name} complete: {created} rows created, {updated} rows updated.")
+    print(f"Import of {table_name} complete: {created} rows created, {updated} rows updated.")
+
+if __name__ == "__main__":
+    main()
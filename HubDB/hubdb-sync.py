@@ -0,0 +1,101 @@
+import logging
+import os
+from dotenv import load_dotenv
+from hubdb_client import get_session, get_table, iter_rows, create_table, column_options, row_input, row_hash, batch_rows, publish_table
+
+# Loads the .env file into the system environment
+load_dotenv()
+
+# Constants
+API_KEY_SOURCE = os.getenv('GS_API_KEY')  # Replace with the API key of the portal that owns the table
+API_KEY_TARGET = os.getenv('NP_API_KEY')  # Replace with the API key of the portal being kept in sync
+TABLE_ID_OR_NAME = 'cmo_source'  # HubDB table ID or name in the source portal
+KEY_COLUMN = 'form_id'  # Column that identifies the same row in both portals
+
+# Configure logging
+logging.basicConfig(
+    filename='hubdb_sync.log',
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Function to index a table's rows by key column, keeping only the row hash and row ID
+def index_rows(rows, table_label):
+    index = {}
+    for row in rows:
+        key = row.get('values', {}).get(KEY_COLUMN)
+        if key is None:
+            logging.warning(f"Row {row.get('id')} in {table_label} has no {KEY_COLUMN}; it is not synced.")
+            continue
+        if key in index:
+            logging.warning(f"Duplicate {KEY_COLUMN} '{key}' in {table_label}; row {row.get('id')} is ignored.")
+            continue
+        index[key] = (row_hash(row), row.get('id'))
+    return index
+
+def main():
+    source_session = get_session(API_KEY_SOURCE)
+    target_session = get_session(API_KEY_TARGET)
+
+    source_table = get_table(source_session, TABLE_ID_OR_NAME)
+    if not source_table:
+        logging.error(f"HubDB table {TABLE_ID_OR_NAME} not found in the source portal.")
+        print(f"HubDB table {TABLE_ID_OR_NAME} not found in the source portal.")
+        return
+    table_name = source_table['name']
+
+    target_table = get_table(target_session, table_name, draft=True)
+    if not target_table:
+        target_table = create_table(target_session, source_table)
+        logging.info(f"Created HubDB table {table_name} in the target (ID {target_table['id']}).")
+    table_id = target_table['id']
+    target_options = column_options(target_table)  # Option cells are matched to the target's options by name
+
+    # The target side is indexed first and only by hash, so it can be compared at any table size
+    target_index = index_rows(iter_rows(target_session, table_id, draft=True), 'target')
+
+    # Source rows are classified as they stream in; only inserted or changed rows are kept
+    inserts = []
+    updates = []
+    seen_keys = set()
+    unchanged = 0
+    for row in iter_rows(source_session, source_table['id']):
+        key = row.get('values', {}).get(KEY_COLUMN)
+        if key is None or key in seen_keys:
+            logging.warning(f"Source row {row.get('id')} has a missing or duplicate {KEY_COLUMN}; it is not synced.")
+            continue
+        seen_keys.add(key)
+
+        if key not in target_index:
+            inserts.append(row_input(row, target_options))
+        elif row_hash(row) != target_index[key][0]:
+            updates.append({'id': target_index[key][1], **row_input(row, target_options)})
+        else:
+            unchanged += 1
+
+    deletes = [row_id for key, (_, row_id) in target_index.items() if key not in seen_keys]
+
+    logging.info(f"Sync plan for {table_name}: {len(inserts)} inserts, {len(updates)} updates, "
+                 f"{len(deletes)} deletes, {unchanged} unchanged.")
+
+    if not (inserts or updates or deletes):
+        print(f"HubDB table {table_name} is already in sync.")
+        return
+
+    created, create_failures = batch_rows(target_session, table_id, 'create', inserts)
+    updated, update_failures = batch_rows(target_session, table_id, 'update', updates)
+    purged, purge_failures = batch_rows(target_session, table_id, 'purge', deletes)
+
+    # Publish once, after the whole delta is in the draft; a partial delta stays unpublished for a rerun
+    failed = create_failures + update_failures + purge_failures
+    if failed:
+        logging.error(f"{failed} rows of {table_name} failed to sync; the table was not published.")
+        print(f"{failed} rows of {table_name} failed to sync; the table was not published. See hubdb_sync.log.")
+        return
+    publish_table(target_session, table_id)
+
+    logging.info(f"Sync of {table_name} complete: {created} created, {updated} updated, {purged} deleted.")
+    print(f"Sync of {table_name} complete: {created} created, {updated} updated, {purged} deleted.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+from itertools import islice
+
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from hubspot_http import get_session, request_with_retries
+
+# Helpers shared by the HubDB export, import and sync scripts
+BASE_API_URL = 'https://api.hubapi.com/cms/v3/hubdb/tables'
+ROWS_PAGE_LIMIT = 1000  # Largest page size accepted by the rows endpoints
+BATCH_SIZE = 100  # Largest number of inputs accepted by the draft rows batch endpoints
+MAX_RETRIES = 5
+
+# Table fields that only make sense in the source portal and are rejected on create
+TABLE_FIELDS_TO_REMOVE = [
+    'id', 'createdAt', 'updatedAt', 'publishedAt', 'createdBy', 'updatedBy',
+    'rowCount', 'published', 'deleted', 'archived', 'columnCount'
+]
+
+# Function to send a request, retrying rate-limited and server errors with the shared backoff
+def request(session, method, url, **kwargs):
+    return request_with_retries(session, method, url, max_retries=MAX_RETRIES, **kwargs)
+
+# Function to fetch a table's schema, from the draft version if requested
+def get_table(session, table_id_or_name, draft=False):
+    url = f'{BASE_API_URL}/{table_id_or_name}/draft' if draft else f'{BASE_API_URL}/{table_id_or_name}'
+    response = request(session, 'GET', url)
+
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch HubDB table {table_id_or_name}. Status code: {response.status_code} - {response.text}")
+
+    return response.json()
+
+# Generator that pages through every row of a table without holding the table in memory
+def iter_rows(session, table_id_or_name, draft=False):
+    url = f'{BASE_API_URL}/{table_id_or_name}/rows/draft' if draft else f'{BASE_API_URL}/{table_id_or_name}/rows'
+    params = {'limit': ROWS_PAGE_LIMIT}
+
+    while True:
+        response = request(session, 'GET', url, params=params)
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch rows for HubDB table {table_id_or_name}. Status code: {response.status_code} - {response.text}")
+
+        data = response.json()
+        logging.debug(f"Fetched {len(data.get('results', []))} rows from HubDB table {table_id_or_name}")
+        yield from data.get('results', [])
+
+        after = data.get('paging', {}).get('next', {}).get('after')
+        if not after:
+            break
+        params['after'] = after
+
+# Function to create a table in the target portal from an exported schema
+def create_table(session, table_data):
+    payload = {key: value for key, value in table_data.items() if key not in TABLE_FIELDS_TO_REMOVE}
+
+    # Column IDs are assigned by the target portal; names and types are what carry over
+    payload['columns'] = [
+        {key: value for key, value in column.items() if key not in ('id', 'foreignIdsById', 'foreignIdsByName')}
+        for column in table_data.get('columns', [])
+    ]
+
+    response = request(session, 'POST', BASE_API_URL, idempotent=False, json=payload)
+    if response.status_code not in (200, 201):
+        raise Exception(f"Failed to create HubDB table {table_data.get('name')}. Status code: {response.status_code} - {response.text}")
+
+    return response.json()
+
+# Function to index a target table's select and multiselect options as {column name: {option name: option}}
+def column_options(table):
+    return {
+        column['name']: {option['name']: option for option in column.get('options', []) if option.get('name')}
+        for column in table.get('columns', []) if column.get('options')
+    }
+
+# Function to point an option cell at the target column's option of the same name
+def map_option_value(value, options):
+    if isinstance(value, list):
+        return [map_option_value(item, options) for item in value]
+    if isinstance(value, dict) and value.get('type') == 'option':
+        # Option IDs are portal-specific; the source ID is never sent, the name identifies the option
+        target_option = options.get(value.get('name'))
+        if target_option and target_option.get('id') is not None:
+            return {'id': target_option['id'], 'name': value['name'], 'type': 'option'}
+        return {'name': value.get('name'), 'type': 'option'}
+    return value
+
+# Function to build the input used by the batch endpoints from an exported row, with options mapped by name
+def row_input(row, target_options=None):
+    target_options = target_options or {}
+    row_data = {'values': {
+        column: map_option_value(value, target_options.get(column, {}))
+        for column, value in row.get('values', {}).items()
+    }}
+    for key in ('path', 'name', 'childTableId', 'displayIndex'):
+        if row.get(key) is not None:
+            row_data[key] = row[key]
+    return row_data
+
+# Function to reduce a cell value to what is comparable across portals
+def normalize_value(value):
+    # Option cells carry portal-specific option IDs; the option name is what identifies them
+    if isinstance(value, dict) and value.get('type') == 'option':
+        return value.get('name')
+    if isinstance(value, list):
+        return [normalize_value(item) for item in value]
+    return value
+
+# Function to hash a row's content so rows can be compared without keeping them in memory
+def row_hash(row):
+    content = {
+        'values': {column: normalize_value(value) for column, value in row.get('values', {}).items()},
+        'path': row.get('path'),
+        'name': row.get('name'),
+    }
+    return hashlib.sha1(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+# Function to send rows through a draft batch endpoint in maximum-size chunks; returns (completed, failed) row counts
+def batch_rows(session, table_id, action, inputs):
+    url = f'{BASE_API_URL}/{table_id}/rows/draft/batch/{action}'
+    inputs = iter(inputs)  # Accepts a generator, so rows can be streamed straight from a file
+    sent = 0
+    completed = 0
+    failed = 0
+
+    while True:
+        chunk = list(islice(inputs, BATCH_SIZE))
+        if not chunk:
+            break
+
+        # Creates are not retried after server errors, which could duplicate rows; updates and purges are safe to resend
+        response = request(session, 'POST', url, idempotent=(action != 'create'), json={'inputs': chunk})
+        first_row, sent = sent, sent + len(chunk)
+
+        if response.status_code not in (200, 201, 204, 207):
+            logging.error(f"Batch {action} failed for rows {first_row}-{sent - 1}: {response.status_code} - {response.text}")
+            failed += len(chunk)
+            continue
+
+        chunk_failed = 0
+        if response.status_code == 207:
+            logging.warning(f"Batch {action} partially failed for rows {first_row}-{sent - 1}: {response.text}")
+            # Each error entry covers at least one row; count one per entry when the rows are not listed
+            chunk_failed = min(len(chunk), max(1, len(response.json().get('errors', []))))
+        completed += len(chunk) - chunk_failed
+        failed += chunk_failed
+        logging.info(f"Batch {action}: {completed} rows sent to table {table_id}")
+
+    return completed, failed
+
+# Function to publish the draft version of a table so its rows go live
+def publish_table(session, table_id):
+    response = request(session, 'POST', f'{BASE_API_URL}/{table_id}/draft/publish')
+    if response.status_code != 200:
+        raise Exception(f"Failed to publish HubDB table {table_id}. Status code: {response.status_code} - {response.text}")
+
+    logging.info(f"Published HubDB table {table_id}")
+    return response.json()
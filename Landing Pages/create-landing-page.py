@@ -3,8 +3,13 @@ import json
 import logging
 from dotenv import load_dotenv
 import os
+import sys
 from datetime import datetime
 
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from payload_rules import load_rules, apply_rule
+
 # Load environment variables
 load_dotenv()
 
@@ -14,6 +19,7 @@ BASE_API_URL = 'https://api.hubapi.com'
 CREATE_LANDING_PAGE_URL = f'{BASE_API_URL}/cms/v3/pages/landing-pages'
 EXPORTED_JSON_FILE = 'exported_page_details.json'  # JSON file with the exported page data
 OUTPUT_FILE = 'created_page_details.json'  # To save the created landing page details
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules', 'mip-to-np.json')  # Cleaning rules for this portal pair
 
 # Configure logging
 logging.basicConfig(
@@ -39,9 +45,7 @@ def create_landing_page():
         payload = json.load(f)
     
     # Remove fields that should not be included in the creation request (e.g., `id`, `createdAt`, etc.)
-    payload.pop('id', None)
-    payload.pop('createdAt', None)
-    payload.pop('updatedAt', None)
+    payload = apply_rule(payload, load_rules(RULES_FILE))
     
     # Convert date fields that may need to be in Unix timestamp format
     if 'archivedAt' in payload and isinstance(payload['archivedAt'], str):
@@ -83,8 +87,13 @@ import json
 import logging
 from dotenv import load_dotenv
 import os
+import sys
 from datetime import datetime
 
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from payload_rules import load_rules, apply_rule
+
 # Load environment variables
 load_dotenv()
 
@@ -94,6 +103,7 @@ BASE_API_URL = 'https://api.hubapi.com'
 CREATE_LANDING_PAGE_URL = f'{BASE_API_URL}/cms/v3/pages/landing-pages'
 EXPORTED_JSON_FILE = 'landing_page_details.json'  # JSON file with the exported page data
 OUTPUT_FILE = 'created_page_details.json'  # To save the created landing page details
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules', 'mip-to-np.json')  # Cleaning rules for this portal pair
 
 # Configure logging
 logging.basicConfig(
@@ -119,9 +129,7 @@ def create_landing_page():
         payload = json.load(f)
     
     # Remove fields that should not be included in the creation request (e.g., `id`, `createdAt`, etc.)
-    payload.pop('id', None)
-    payload.pop('createdAt', None)
-    payload.pop('updatedAt', None)
+    payload = apply_rule(payload, load_rules(RULES_FILE))
     
     # Convert date fields that may need to be in Unix timestamp format
     if 'archivedAt' in payload and isinstance(payload['archivedAt'], str):
@@ -0,0 +1,157 @@
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from json_stream import iter_json_items
+from workflow_refs import iter_references
+
+# Constants
+INDEX_DB = 'property_usage.db'  # SQLite file holding the property -> asset index
+FORM_FILES = ['gs_form_details.json', 'mip_form_details.json']  # Written by forms-export-*.py
+WORKFLOW_FILES = ['workflow_details.json', 'hubspot_workflows.json']  # Written by workflow-export-gs.py / export-workflows.py
+EMAIL_FILES = ['email_details.json']  # Written by emails-export-gs*.py
+INSERT_BATCH_SIZE = 10000  # Usage rows buffered before they are inserted
+
+# Personalization tokens such as {{ contact.firstname }} or {{ personalization_token('contact.firstname') }}
+EMAIL_TOKEN_PATTERN = re.compile(r"\bcontact\.([A-Za-z0-9_]+)")
+
+# Configure logging
+logging.basicConfig(
+    filename='property_usage_index.log',
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Generator of (property, context) pairs for a form, including dependent fields
+def form_property_refs(form_data):
+    pending = [(field, 'field') for group in form_data.get('formFieldGroups', []) for field in group.get('fields', [])]
+    while pending:
+        field, context = pending.pop()
+        if field.get('name'):
+            yield field['name'], context
+        if isinstance(field.get('dependentFormField'), dict):
+            pending.append((field['dependentFormField'], 'dependent field'))
+        for dependent_filter in field.get('dependentFieldFilters', []) or []:
+            if isinstance(dependent_filter.get('dependentFormField'), dict):
+                pending.append((dependent_filter['dependentFormField'], 'dependent field'))
+
+# Generator of (property, context) pairs for a workflow's enrollment criteria and actions
+def workflow_refs(workflow_data):
+    for reference_type, value in iter_references(workflow_data.get('enrollmentCriteria', {})):
+        if reference_type == 'property':
+            yield value, 'enrollment criteria'
+    for action in workflow_data.get('actions', []):
+        context = f"action {action.get('actionId')} ({action.get('actionTypeId')})"
+        for reference_type, value in iter_references(action):
+            if reference_type == 'property':
+                yield value, context
+
+# Generator of (property, context) pairs for personalization tokens anywhere in an email
+def email_refs(email_data):
+    pending = [email_data]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if isinstance(current, dict):
+            pending.extend(current.values())
+        elif isinstance(current, list):
+            pending.extend(current)
+        elif isinstance(current, str) and 'contact.' in current:
+            for property_name in EMAIL_TOKEN_PATTERN.findall(current):
+                if property_name not in seen:
+                    seen.add(property_name)
+                    yield property_name, 'personalization token'
+
+# Generator of usage rows for every asset in the exported files, one asset at a time
+def iter_usage_rows():
+    sources = [
+        ('form', FORM_FILES, form_property_refs, lambda key, data: data.get('guid') or data.get('id')),
+        ('workflow', WORKFLOW_FILES, workflow_refs, lambda key, data: data.get('id') or key),
+        ('email', EMAIL_FILES, email_refs, lambda key, data: data.get('id')),
+    ]
+
+    for asset_type, files, extract_refs, asset_id_of in sources:
+        for path in files:
+            if not os.path.exists(path):
+                logging.info(f"Skipping {path}; file not found.")
+                continue
+
+            asset_count = 0
+            for key, asset_data in iter_json_items(path):
+                if not isinstance(asset_data, dict):
+                    continue
+                asset_id = str(asset_id_of(key, asset_data))
+                asset_name = asset_data.get('name', '')
+                for property_name, context in extract_refs(asset_data):
+                    yield property_name, asset_type, asset_id, asset_name, context, path
+                asset_count += 1
+            logging.info(f"Indexed {asset_count} {asset_type}s from {path}")
+
+def build_index(db_file):
+    # Build into a temporary file and swap it in, so lookups never see a half-built index
+    temp_file = db_file + '.tmp'
+    if os.path.exists(temp_file):
+        os.remove(temp_file)
+
+    connection = sqlite3.connect(temp_file)
+    connection.execute("""
+        CREATE TABLE usage (
+            property TEXT NOT NULL, asset_type TEXT NOT NULL, asset_id TEXT, asset_name TEXT,
+            context TEXT, source_file TEXT
+        )
+    """)
+
+    total = 0
+    batch = []
+    for row in iter_usage_rows():
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH_SIZE:
+            connection.executemany("INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?)", batch)
+            total += len(batch)
+            batch = []
+    connection.executemany("INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?)", batch)
+    total += len(batch)
+
+    # The index is created after loading, which is much faster than maintaining it per insert
+    connection.execute("CREATE INDEX usage_by_property ON usage (property, asset_type)")
+    connection.commit()
+    connection.close()
+    os.replace(temp_file, db_file)
+
+    logging.info(f"Indexed {total} property references into {db_file}")
+    print(f"Indexed {total} property references into {db_file}")
+
+def lookup(db_file, property_names):
+    connection = sqlite3.connect(db_file)
+    for property_name in property_names:
+        start = time.perf_counter()
+        rows = connection.execute(
+            "SELECT DISTINCT asset_type, asset_id, asset_name, context FROM usage WHERE property = ? "
+            "ORDER BY asset_type, asset_name",
+            (property_name,)
+        ).fetchall()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{property_name}: {len(rows)} references ({elapsed_ms:.1f} ms)")
+        for asset_type, asset_id, asset_name, context in rows:
+            print(f"  {asset_type:<9} {asset_id:<40} {asset_name} [{context}]")
+    connection.close()
+
+def main():
+    # Usage: property-usage-index.py            rebuild the index from the exported JSON files
+    #        property-usage-index.py NAME ...   list the forms, workflows and emails that use NAME
+    if len(sys.argv) > 1:
+        if not os.path.exists(INDEX_DB):
+            print(f"{INDEX_DB} not found. Run without arguments first to build the index.")
+            return
+        lookup(INDEX_DB, sys.argv[1:])
+    else:
+        build_index(INDEX_DB)
+
+if __name__ == "__main__":
+    main()
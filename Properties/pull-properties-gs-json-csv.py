@@ -1,12 +1,18 @@
 import csv
-import json
+import os
+import sys
 
-# Assuming the JSON data is saved in a file named 'properties.json'
-with open('specific_contact_properties.json', 'r') as json_file:
-    properties_data = json.load(json_file)
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from json_stream import iter_json_items, open_text
+
+# Constants
+JSON_FILE = 'specific_contact_properties.json'  # Written by pull-properties-gs-json.py; use the .json.gz name if it was compressed
+GZIP_OUTPUT = False  # True writes properties_for_creation.csv.gz instead of the plain CSV
+OUTPUT_CSV = 'properties_for_creation.csv' + ('.gz' if GZIP_OUTPUT else '')
 
 # Open a CSV file to write the data
-with open('properties_for_creation.csv', mode='w', newline='') as file:
+with open_text(OUTPUT_CSV, 'w', newline='') as file:
     writer = csv.writer(file)
 
     # Write the header
@@ -15,8 +21,9 @@ with open('properties_for_creation.csv', mode='w', newline='') as file:
         'Option Description', 'Option Display Order', 'Option Hidden'
     ])
 
-    # Iterate over each property in the JSON data
-    for property in properties_data:
+    # Stream the properties one at a time, so even enumerations with thousands of options never
+    # hold more than one property in memory
+    for _, property in iter_json_items(JSON_FILE):
         name = property.get('name', '')
         label = property.get('label', '')
         property_type = property.get('type', '')
@@ -25,22 +32,16 @@ with open('properties_for_creation.csv', mode='w', newline='') as file:
 
         # If the property has options, we need to iterate over them
         if 'options' in property:
-            for option in property['options']:
-                option_label = option.get('label', '')
-                option_value = option.get('value', '')
-                option_description = option.get('description', '')
-                option_display_order = option.get('displayOrder', '')
-                option_hidden = option.get('hidden', '')
-
-                # Write the property and its options to the CSV file
-                writer.writerow([
+            writer.writerows(
+                [
                     name, label, property_type, field_type, group_name,
-                    option_label, option_value, option_description,
-                    option_display_order, option_hidden
-                ])
+                    option.get('label', ''), option.get('value', ''), option.get('description', ''),
+                    option.get('displayOrder', ''), option.get('hidden', '')
+                ]
+                for option in property['options']
+            )
         else:
             # If no options, still write the property with empty option fields
             writer.writerow([name, label, property_type, field_type, group_name, '', '', '', '', ''])
 
-print("Properties data has been saved to properties_for_creation.csv")
-
+print(f"Properties data has been saved to {OUTPUT_CSV}")
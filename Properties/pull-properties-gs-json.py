@@ -1,9 +1,13 @@
 import requests
 import csv
-import json
 import os
+import sys
 from dotenv import load_dotenv
 
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from json_stream import open_text, write_json_array
+
 # Load the .env file into the system environment
 load_dotenv()
 
@@ -11,6 +15,8 @@ load_dotenv()
 API_KEY = os.getenv('NPSB_API_KEY')  # Replace with your actual API key
 BASE_API_URL = 'https://api.hubapi.com'  # Base URL for HubSpot API
 OBJECT_TYPE = 'contacts'  # Specify the object type (e.g., 'contacts', 'companies', etc.)
+GZIP_OUTPUT = False  # True writes specific_contact_properties.json.gz instead of the plain JSON
+OUTPUT_JSON = 'specific_contact_properties.json' + ('.gz' if GZIP_OUTPUT else '')
 
 # Set the headers, including the API key
 headers = {
@@ -25,27 +31,26 @@ with open('property_names.csv', mode='r') as file:
     for row in csv_reader:
         property_names.append(row['Property Name'])  # Ensure the column name is 'Property Name'
 
-# Loop through each property name and retrieve its details
-retrieved_properties = []
-for property_name in property_names:
-    url = f'{BASE_API_URL}/crm/v3/properties/{OBJECT_TYPE}/{property_name}'
-    
-    # Make the GET request to retrieve the specific property
-    response = requests.get(url, headers=headers)
-    
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response and store the property details
-        property_data = response.json()
-        retrieved_properties.append(property_data)
-        print(f"Successfully retrieved property '{property_name}'")
-    else:
-        print(f"Failed to retrieve property '{property_name}'. Status code: {response.status_code}")
-        print(f"Error details: {response.text}")
-
-# Save the retrieved properties to a JSON file for review
-with open('specific_contact_properties.json', mode='w') as json_file:
-    json.dump(retrieved_properties, json_file, indent=4)
-
-print("Selected contact properties have been saved to specific_contact_properties.json")
-
+# Generator that retrieves each property's details in turn
+def fetch_properties(property_names):
+    for property_name in property_names:
+        url = f'{BASE_API_URL}/crm/v3/properties/{OBJECT_TYPE}/{property_name}'
+        
+        # Make the GET request to retrieve the specific property
+        response = requests.get(url, headers=headers)
+        
+        # Check if the request was successful
+        if response.status_code == 200:
+            # Parse the JSON response and pass the property details on
+            print(f"Successfully retrieved property '{property_name}'")
+            yield response.json()
+        else:
+            print(f"Failed to retrieve property '{property_name}'. Status code: {response.status_code}")
+            print(f"Error details: {response.text}")
+
+# Save the retrieved properties to a JSON file for review, writing each one as it arrives
+# so large enumeration properties are never all held in memory together
+with open_text(OUTPUT_JSON, 'w') as json_file:
+    write_json_array(json_file, fetch_properties(property_names))
+
+print(f"Selected contact properties have been saved to {OUTPUT_JSON}")
@@ -0,0 +1,60 @@
+import logging
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from portal_schema import fetch_portal_schema, save_schema
+from schema_cache import SchemaCache
+
+# Loads the .env file into the system environment
+load_dotenv()
+
+# Constants
+PORTAL_API_KEYS = {  # Portal key -> environment variable holding its API key
+    'gs': 'GS_API_KEY',
+    'mip': 'MIP_API_KEY',
+    'np': 'NP_API_KEY',
+    'npsb': 'NPSB_API_KEY',
+}
+SCHEMA_FILE = 'schema_{portal}.json'  # One file per portal with properties and groups of every object type
+CACHE_MAX_AGE = 0  # Seconds a cached response is used without revalidating; raise it for repeated development runs
+
+# Configure logging
+logging.basicConfig(
+    filename='pull_schema.log',
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    # Usage: pull-schema.py [PORTAL ...]   defaults to every portal with an API key set
+    portals = sys.argv[1:] or [portal for portal, env_var in PORTAL_API_KEYS.items() if os.getenv(env_var)]
+
+    for portal in portals:
+        api_key = os.getenv(PORTAL_API_KEYS.get(portal, ''))
+        if not api_key:
+            print(f"No API key set for portal '{portal}' ({PORTAL_API_KEYS.get(portal, 'unknown portal')}), skipping.")
+            continue
+
+        start_time = time.perf_counter()
+        cache = SchemaCache(portal, api_key, max_age=CACHE_MAX_AGE)
+        try:
+            schema = fetch_portal_schema(api_key, cache=cache)
+        except Exception as e:
+            logging.error(f"Failed to export schema for {portal}: {e}")
+            print(f"Failed to export schema for {portal}: {e}")
+            continue
+
+        schema_file = SCHEMA_FILE.format(portal=portal)
+        save_schema(schema, schema_file)
+        property_count = sum(len(obj['properties']) for obj in schema['objects'].values())
+        summary = (f"Saved {property_count} properties for {len(schema['objects'])} object types of {portal} "
+                   f"to {schema_file} in {time.perf_counter() - start_time:.1f}s ({cache.summary()})")
+        logging.info(summary)
+        print(summary)
+
+if __name__ == "__main__":
+    main()
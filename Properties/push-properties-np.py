@@ -1,9 +1,20 @@
-import requests
 import os
+import sys
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from dotenv import load_dotenv
 
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from target_schema import fetch_target_schema
+from payload_validation import validate_property, write_report
+from hubspot_http import get_session, request_with_retries
+from portal_schema import fetch_portal_schema, load_schema, normalize_property, save_schema
+from schema_diff import diff_properties
+from schema_cache import SchemaCache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', filename='property_creation.log', filemode='w')
 
@@ -14,15 +25,69 @@ load_dotenv()
 API_KEY = os.getenv('NP_API_KEY')  # Replace with your actual API key for the new instance
 BASE_API_URL = 'https://api.hubapi.com'  # Base URL for HubSpot API
 OBJECT_TYPE = 'contacts'  # Specify the object type (e.g., 'contacts', 'companies', etc.)
+TARGET_PORTAL = 'np'  # Key of the new instance in the shared schema cache
+DRY_RUN = '--dry-run' in sys.argv  # Validate the properties against the target schema without creating anything
+DRY_RUN_REPORT = 'dry_run_properties.csv'
+TARGET_SCHEMA_FILE = 'schema_np.json'  # Target schema fetched at the start of each push, kept for later diffs
+BATCH_SIZE = 100  # Properties per batch create request
+UPDATE_WORKERS = 8  # Property updates sent concurrently; the API has no batch update for property definitions
+SOURCE_SCHEMA_FILE = 'schema_gs.json'  # Source portal schema from pull-schema.py; supplies group labels when present
 
 # HubSpot API endpoint for creating a property
 url = f'{BASE_API_URL}/crm/v3/properties/{OBJECT_TYPE}'
 
-# Set the headers, including the API key
-headers = {
-    'Authorization': f'Bearer {API_KEY}',
-    'Content-Type': 'application/json'
-}
+# Function to send one batch create and return the names created
+def create_batch(batch):
+    response = request_with_retries(get_session(API_KEY), 'POST', f'{url}/batch/create', idempotent=False, json={'inputs': batch})
+    # 207 means part of the batch failed; the properties that were created are still in results
+    if response.status_code not in (200, 201, 207):
+        logging.error(f"Failed to create {len(batch)} properties. Status code: {response.status_code}")
+        logging.error(f"Error details: {response.text}")
+        return []
+    data = response.json()
+    for error in data.get('errors', []):
+        logging.error(f"Failed to create property: {error.get('message')} {error.get('context', '')}")
+    return [prop['name'] for prop in data.get('results', [])]
+
+# Function to create one property group and return its name, or None if it failed
+def create_group(group):
+    response = request_with_retries(get_session(API_KEY), 'POST', f'{url}/groups', idempotent=False, json=group)
+    if response.status_code in (200, 201):
+        logging.info(f"Property group '{group['name']}' created successfully.")
+        return group['name']
+    logging.error(f"Failed to create property group '{group['name']}'. Status code: {response.status_code}")
+    logging.error(f"Error details: {response.text}")
+    return None
+
+# Function to create every group the payloads use that the target lacks, before any property is pushed
+def create_missing_groups(payloads, target_groups):
+    needed = {payload['groupName'] for payload in payloads if payload.get('groupName')}
+    missing = sorted(needed - {group['name'] for group in target_groups})
+    if not missing:
+        return set()
+
+    # Reuse the source portal's labels and order where available, so groups look the same in both portals
+    source_groups = {}
+    if os.path.exists(SOURCE_SCHEMA_FILE):
+        source_groups = {group['name']: group for group in load_schema(SOURCE_SCHEMA_FILE)['objects'].get(OBJECT_TYPE, {}).get('groups', [])}
+    groups = [source_groups.get(name, {'name': name, 'label': name.replace('_', ' ').title()}) for name in missing]
+
+    # Property groups have no batch endpoint, so the whole set is created concurrently in one stage
+    with ThreadPoolExecutor(max_workers=UPDATE_WORKERS) as executor:
+        created_groups = {name for name in executor.map(create_group, groups) if name}
+    logging.info(f"Created {len(created_groups)} of {len(missing)} missing property groups")
+    return set(missing) - created_groups
+
+# Function to update the changed attributes of one existing property
+def update_property(update):
+    property_name, patch = update
+    response = request_with_retries(get_session(API_KEY), 'PATCH', f'{url}/{property_name}', json=patch)
+    if response.status_code == 200:
+        logging.info(f"Property '{property_name}' updated: {', '.join(patch)}")
+        return True
+    logging.error(f"Failed to update property '{property_name}'. Status code: {response.status_code}")
+    logging.error(f"Error details: {response.text}")
+    return False
 
 # Log start of process
 logging.info("Starting property creation process...")
@@ -32,42 +97,61 @@ try:
     with open('contact_properties_with_options.json', mode='r') as file:
         properties_data = json.load(file)
 
-    # Iterate through each property in the JSON data
+    # With --dry-run, check every property locally and stop before any write call
+    if DRY_RUN:
+        schema = fetch_target_schema(API_KEY, TARGET_PORTAL)
+        write_report([('property', property_data.get('name'), validate_property(property_data, schema)) for property_data in properties_data], DRY_RUN_REPORT)
+        sys.exit()
+
+    # Construct the property data for the API, with options only where the property has them
+    property_payloads = []
     for property_data in properties_data:
-        property_name = property_data['name']
-        label = property_data['label']
-        prop_type = property_data['type']
-        field_type = property_data['fieldType']  # Get the field type
-        group_name = property_data['groupName']
-        options = property_data.get('options', [])
-
-        # Log the processing of each property
-        logging.info(f"Processing Property: {property_name}")
-        if options:
-            logging.info(f"Options: {options}")  # Log the options for debugging
-
-        # Construct the property data for the API
         property_payload = {
-            'name': property_name,
-            'label': label,
-            'type': prop_type,
-            'fieldType': field_type,  # Include fieldType in the payload
-            'groupName': group_name,
+            'name': property_data['name'],
+            'label': property_data['label'],
+            'type': property_data['type'],
+            'fieldType': property_data['fieldType'],  # Include fieldType in the payload
+            'groupName': property_data['groupName'],
         }
+        if property_data.get('options'):
+            property_payload['options'] = normalize_property(property_data)['options']
+        property_payloads.append(property_payload)
+
+    # Compare against the target's current schema and push only what is missing or changed
+    target_schema = fetch_portal_schema(API_KEY, [OBJECT_TYPE], cache=SchemaCache(TARGET_PORTAL, API_KEY))
+    save_schema(target_schema, TARGET_SCHEMA_FILE)
+    creates, updates, identical, protected = diff_properties(property_payloads, target_schema['objects'][OBJECT_TYPE]['properties'])
+    logging.info(f"{len(creates)} properties to create, {len(updates)} to update, {len(identical)} already identical")
+
+    # HubSpot-defined properties such as lifecyclestage are left as the target has them; differences are only reported
+    for property_name, patch in protected:
+        logging.warning(f"Not updating HubSpot-defined property '{property_name}', which differs in: {', '.join(patch)}")
+
+    # Properties whose group could not be created would only fail, so they are held back and reported
+    group_updates = [patch for _, patch in updates if 'groupName' in patch]
+    failed_groups = create_missing_groups(creates + group_updates, target_schema['objects'][OBJECT_TYPE]['groups'])
+    if failed_groups:
+        held_back = [prop['name'] for prop in creates if prop['groupName'] in failed_groups]
+        held_back += [name for name, patch in updates if patch.get('groupName') in failed_groups]
+        creates = [prop for prop in creates if prop['groupName'] not in failed_groups]
+        updates = [(name, patch) for name, patch in updates if patch.get('groupName') not in failed_groups]
+        logging.error(f"Skipping {len(held_back)} properties in groups that could not be created: {', '.join(held_back)}")
+        print(f"Skipping {len(held_back)} properties in groups that could not be created: {', '.join(sorted(failed_groups))}")
 
-        # Include options in the payload if they exist
-        if options:
-            property_payload['options'] = options
+    created = []
+    creates_iter = iter(creates)
+    while batch := list(islice(creates_iter, BATCH_SIZE)):
+        created.extend(create_batch(batch))
+    for property_name in created:
+        logging.info(f"Property '{property_name}' created successfully.")
 
-        # Make the POST request to create the property
-        response = requests.post(url, headers=headers, json=property_payload)
+    with ThreadPoolExecutor(max_workers=UPDATE_WORKERS) as executor:
+        updated = sum(executor.map(update_property, updates))
 
-        # Check if the request was successful
-        if response.status_code == 201:
-            logging.info(f"Property '{property_name}' created successfully.")
-        else:
-            logging.error(f"Failed to create property '{property_name}'. Status code: {response.status_code}")
-            logging.error(f"Error details: {response.text}")
+    summary = (f"Created {len(created)} of {len(creates)} new properties, updated {updated} of {len(updates)} changed properties, "
+               f"{len(identical)} already identical, {len(protected)} HubSpot-defined left unchanged.")
+    logging.info(summary)
+    print(summary)
 
 except FileNotFoundError as e:
     logging.error(f"JSON file not found: {e}")
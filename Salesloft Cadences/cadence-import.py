@@ -3,6 +3,11 @@ import logging
 import json
 from dotenv import load_dotenv
 import os
+import sys
+
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from remap_store import RemapStore
 
 # Load environment variables from .env file
 load_dotenv()
@@ -10,6 +15,8 @@ load_dotenv()
 # Constants
 API_KEY = os.getenv('SLGS_API_KEY')  # Replace with your SalesLoft API key from .env
 BASE_API_URL = 'https://api.salesloft.com/v2'
+SOURCE_PORTAL = 'slgs'  # Key of the exported SalesLoft account in the ID remap store
+REMAP_DB = 'id_remap.db'  # Source cadence -> new cadence ID, read by later migration stages
 
 # Configure logging
 logging.basicConfig(
@@ -47,13 +54,17 @@ def main():
         transformed_data = json.load(json_file)
 
     # Iterate through each cadence and send it to the API
-    for cadence_data in transformed_data:
-        created_cadence = create_cadence(cadence_data)
+    with RemapStore(REMAP_DB) as remap_store:
+        for cadence_data in transformed_data:
+            created_cadence = create_cadence(cadence_data)
 
-        if created_cadence:
-            logging.info(f"Cadence '{cadence_data['settings']['name']}' created successfully.")
-        else:
-            logging.info(f"Failed to create cadence '{cadence_data['settings']['name']}'.")
+            if created_cadence:
+                logging.info(f"Cadence '{cadence_data['settings']['name']}' created successfully.")
+                # The transformed export carries no source ID, so cadences are keyed by name
+                new_cadence_id = created_cadence.get('data', {}).get('cadence', {}).get('id')
+                remap_store.record('cadence', SOURCE_PORTAL, cadence_data['settings']['name'], new_cadence_id)
+            else:
+                logging.info(f"Failed to create cadence '{cadence_data['settings']['name']}'.")
 
 if __name__ == "__main__":
     main()
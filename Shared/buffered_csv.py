@@ -0,0 +1,51 @@
+import csv
+import threading
+import time
+
+class BufferedCsvWriter:
+    """CSV writer that keeps one file handle open for a whole run and writes rows in batches.
+
+    Rows are flushed once max_rows are buffered or flush_interval seconds have passed, and on close.
+    The writer is safe to share between threads. Output is the same as csv.writer with the default
+    dialect writing each row straight to the file.
+    """
+
+    def __init__(self, path, header=None, max_rows=5000, flush_interval=5.0, buffer_size=1024 * 1024):
+        self.file = open(path, 'w', newline='', buffering=buffer_size)
+        self.writer = csv.writer(self.file)
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.rows = []
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+        if header:
+            self.writer.writerow(header)
+
+    def write_rows(self, rows):
+        with self.lock:
+            self.rows.extend(rows)
+            if len(self.rows) >= self.max_rows or time.monotonic() - self.last_flush >= self.flush_interval:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if self.rows:
+            self.writer.writerows(self.rows)
+            self.rows = []
+        self.file.flush()
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,62 @@
+import logging
+from itertools import islice
+from hubspot_http import get_session, request_with_retries
+
+# Bulk workflow discovery through the automation v4 flows list and batch read endpoints
+FLOWS_API_URL = 'https://api.hubapi.com/automation/v4/flows'
+LIST_PAGE_LIMIT = 100  # Flows listed per page
+BATCH_READ_SIZE = 100  # Flow definitions requested per batch read
+
+# Generator that pages through the summaries of every flow in the portal
+def iter_flow_summaries(api_key):
+    session = get_session(api_key)
+    params = {'limit': LIST_PAGE_LIMIT}
+
+    while True:
+        response = request_with_retries(session, 'GET', FLOWS_API_URL, params=params)
+        if response.status_code != 200:
+            raise Exception(f"Error listing workflows: {response.status_code} - {response.text}")
+
+        data = response.json()
+        yield from data.get('results', [])
+
+        after = data.get('paging', {}).get('next', {}).get('after')
+        if not after:
+            return
+        params = {'limit': LIST_PAGE_LIMIT, 'after': after}
+
+# Generator of full flow definitions for the given IDs, BATCH_READ_SIZE flows per request
+def iter_flow_definitions(api_key, flow_ids):
+    session = get_session(api_key)
+    flow_ids = iter(flow_ids)
+
+    while True:
+        chunk = [str(flow_id) for flow_id in islice(flow_ids, BATCH_READ_SIZE)]
+        if not chunk:
+            return
+
+        response = request_with_retries(
+            session, 'POST', f'{FLOWS_API_URL}/batch/read',
+            json={'inputs': [{'flowId': flow_id, 'type': 'FLOW_ID'} for flow_id in chunk]}
+        )
+        # 207 means some flows in the chunk could not be read; the rest are still returned
+        if response.status_code not in (200, 207):
+            logging.error(f"Error batch reading {len(chunk)} workflows: {response.status_code} - {response.text}")
+            continue
+
+        data = response.json()
+        for error in data.get('errors', []):
+            logging.error(f"Error batch reading workflows: {error.get('message')} {error.get('context', '')}")
+        logging.debug(f"Batch read {len(data.get('results', []))} of {len(chunk)} workflows")
+        yield from data.get('results', [])
+
+def fetch_all_workflows(api_key):
+    """Return the full definition of every workflow in the portal, in the order they are listed."""
+    flow_ids = [summary['id'] for summary in iter_flow_summaries(api_key)]
+    logging.info(f"Discovered {len(flow_ids)} workflows")
+
+    workflows = {str(workflow['id']): workflow for workflow in iter_flow_definitions(api_key, flow_ids)}
+    missing = [flow_id for flow_id in flow_ids if str(flow_id) not in workflows]
+    if missing:
+        logging.error(f"{len(missing)} workflows could not be read: {', '.join(map(str, missing))}")
+    return [workflows[str(flow_id)] for flow_id in flow_ids if str(flow_id) in workflows]
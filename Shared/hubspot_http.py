@@ -0,0 +1,83 @@
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import requests
+
+# HTTP helpers shared by the scripts that talk to HubSpot concurrently
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}  # Rate limits and transient server errors
+# A create that fails with 500/502/504 may still have been applied, so only statuses that mean
+# the request was turned away are retried for non-idempotent requests
+CREATE_RETRY_STATUS_CODES = {429, 503}
+MAX_BACKOFF_SECONDS = 60
+
+_local = threading.local()
+
+def get_session(api_key):
+    """Return a session for the current thread, so each concurrent worker keeps its own connection pool."""
+    sessions = getattr(_local, 'sessions', None)
+    if sessions is None:
+        sessions = _local.sessions = {}
+
+    if api_key not in sessions:
+        session = requests.Session()
+        session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        })
+        sessions[api_key] = session
+    return sessions[api_key]
+
+# Function to read Retry-After, which may be either seconds or an HTTP date
+def retry_after_seconds(response):
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+# Function to pick a full-jitter exponential backoff delay for an attempt
+def backoff_delay(attempt, base_delay=1.0):
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, base_delay * 2 ** attempt))
+
+def request_with_retries(session, method, url, max_retries=5, base_delay=1.0, idempotent=True, **kwargs):
+    """Send a request, retrying 429/5xx responses and connection errors.
+
+    Waits for Retry-After when the server sends it, otherwise uses jittered exponential backoff.
+    The last response is returned once retries run out; other statuses are returned immediately.
+    Pass idempotent=False for creates: they are only retried on 429/503 and on connect timeouts,
+    where the request cannot have been applied, so a create is never sent twice.
+    """
+    retry_status_codes = RETRY_STATUS_CODES if idempotent else CREATE_RETRY_STATUS_CODES
+    retry_errors = (requests.exceptions.ConnectionError, requests.exceptions.Timeout) if idempotent else requests.exceptions.ConnectTimeout
+    for attempt in range(max_retries + 1):
+        try:
+            response = session.request(method, url, **kwargs)
+        except retry_errors as e:
+            if attempt == max_retries:
+                raise
+            delay = backoff_delay(attempt, base_delay)
+            logging.warning(f"{method} {url} failed with {e}, retrying in {delay:.1f}s (Attempt {attempt + 1})")
+            time.sleep(delay)
+            continue
+
+        if response.status_code not in retry_status_codes or attempt == max_retries:
+            return response
+
+        retry_after = retry_after_seconds(response)
+        if retry_after is not None:
+            # Spread workers that were all told the same Retry-After so they don't return together
+            delay = min(MAX_BACKOFF_SECONDS, retry_after) + random.uniform(0, base_delay)
+        else:
+            delay = backoff_delay(attempt, base_delay)
+        logging.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.1f}s (Attempt {attempt + 1})")
+        time.sleep(delay)
+
+    return response
@@ -0,0 +1,93 @@
+import gzip
+import json
+import textwrap
+
+# Incremental reader and writer for large exported JSON files, so assets can be processed one at a time
+# without loading the whole file. Handles a top-level array (yields index, item) or object
+# (yields key, value), which covers every export format written by these scripts.
+# Paths ending in .gz are read and written gzip-compressed.
+
+CHUNK_SIZE = 1024 * 1024
+WHITESPACE = ' \t\r\n'
+DELIMITERS = WHITESPACE + ',]}:'  # Characters that can follow a complete value inside an array or object
+
+def open_text(path, mode='r', newline=None):
+    """Open a text file for reading or writing, through gzip when the path ends in .gz."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline=newline)
+    return open(path, mode, encoding='utf-8', newline=newline)
+
+def write_json_array(file, items, indent=4):
+    """Write items to file as a JSON array, one item at a time. Output matches json.dump(list(items), file, indent=indent)."""
+    count = 0
+    for item in items:
+        file.write('[\n' if count == 0 else ',\n')
+        file.write(textwrap.indent(json.dumps(item, indent=indent), ' ' * indent))
+        count += 1
+    file.write('\n]' if count else '[]')
+    return count
+
+def iter_json_items(path, chunk_size=CHUNK_SIZE):
+    decoder = json.JSONDecoder()
+
+    with open_text(path) as file:
+        buffer = ''
+        position = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, position, eof
+            chunk = file.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[position:] + chunk
+            position = 0
+
+        def skip(characters):
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in characters:
+                    position += 1
+                if position < len(buffer) or eof:
+                    return
+                fill()
+
+        def decode():
+            nonlocal position
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                    # A number cut by the chunk boundary (-2. or 1.5e) still decodes as a shorter number,
+                    # so a value only counts as complete once a delimiter follows it
+                    if eof or (end < len(buffer) and buffer[end] in DELIMITERS):
+                        position = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+
+        skip(WHITESPACE)
+        if position >= len(buffer):
+            return
+        opening = buffer[position]
+        if opening not in '[{':
+            raise ValueError(f"{path} must contain a JSON array or object at the top level")
+        closing = ']' if opening == '[' else '}'
+        position += 1
+
+        index = 0
+        while True:
+            skip(WHITESPACE + ',')
+            if position >= len(buffer):
+                raise ValueError(f"{path} ended before the closing '{closing}'")
+            if buffer[position] == closing:
+                return
+
+            if opening == '{':
+                key = decode()
+                skip(WHITESPACE + ':')
+                yield key, decode()
+            else:
+                yield index, decode()
+                index += 1
@@ -0,0 +1,133 @@
+import csv
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Declarative payload cleaning shared by the form, email and landing page creators.
+#
+# A rules file is JSON with a root rule name, optional CSV-backed name mappings and a set of
+# named rules. Each rule can:
+#   remove_keys  - keys popped from the object
+#   set_keys     - keys forced to a value
+#   drop_if      - {key: [values]}; the object is dropped from its parent when its key matches
+#   rename       - {key: mapping name}; the key's value is replaced through the named mapping
+#   children     - {key: rule name}; the rule is applied to the dict or list of dicts under key
+#
+# Example (Forms/rules/gs-to-np.json):
+#   {
+#     "root": "form",
+#     "mappings": {"fields": {"csv": "field_mappings.csv", "from": "gs_internal_name", "to": "external_name"}},
+#     "rules": {
+#       "form": {"remove_keys": ["guid"], "children": {"formFieldGroups": "field_group"}},
+#       "field_group": {"children": {"fields": "field"}},
+#       "field": {"drop_if": {"name": ["leadsource"]}, "rename": {"name": "fields"},
+#                 "children": {"dependentFormField": "field"}}
+#     }
+#   }
+
+class CompiledRule:
+    __slots__ = ('name', 'remove_keys', 'set_keys', 'drop_if', 'rename', 'children')
+
+    def __init__(self, name):
+        self.name = name
+        self.remove_keys = frozenset()
+        self.set_keys = {}
+        self.drop_if = {}
+        self.rename = {}
+        self.children = {}
+
+# Function to load a CSV-backed mapping as a source name -> target name dict
+def load_mapping(spec, base_dir):
+    csv_file = spec['csv'] if os.path.isabs(spec['csv']) else os.path.join(base_dir, spec['csv'])
+    mapping = {}
+    with open(csv_file, mode='r', encoding='utf-8-sig') as file:
+        reader = csv.DictReader(file)
+        for row in reader:
+            try:
+                source_name = row[spec['from']].strip()
+                target_name = row[spec['to']].strip()
+            except (KeyError, AttributeError) as e:
+                logging.error(f"Missing expected key in row: {row}. Error: {e}")
+                continue
+            # When several target names share a source name, the first one listed wins
+            if source_name and target_name:
+                mapping.setdefault(source_name, target_name)
+    logging.info(f"Loaded {len(mapping)} mappings from {csv_file}.")
+    return mapping
+
+def compile_rules(rules_data, base_dir='.'):
+    """Turn parsed rules data into linked CompiledRule objects. Returns the root rule."""
+    mappings = {name: load_mapping(spec, base_dir) for name, spec in rules_data.get('mappings', {}).items()}
+    compiled = {name: CompiledRule(name) for name in rules_data['rules']}
+
+    for name, rule_data in rules_data['rules'].items():
+        rule = compiled[name]
+        rule.remove_keys = frozenset(rule_data.get('remove_keys', []))
+        rule.set_keys = dict(rule_data.get('set_keys', {}))
+        rule.drop_if = {key: frozenset(str(value).strip() for value in values)
+                        for key, values in rule_data.get('drop_if', {}).items()}
+        try:
+            rule.rename = {key: mappings[mapping_name] for key, mapping_name in rule_data.get('rename', {}).items()}
+            rule.children = {key: compiled[child_name] for key, child_name in rule_data.get('children', {}).items()}
+        except KeyError as e:
+            raise ValueError(f"Rule '{name}' refers to unknown mapping or rule {e}")
+
+    return compiled[rules_data['root']]
+
+def load_rules(rules_file, base_dir='.'):
+    """Read and compile a rules file. Mapping CSVs are resolved against base_dir (the working directory by default)."""
+    with open(rules_file, 'r') as file:
+        return compile_rules(json.load(file), base_dir)
+
+# Function to check whether an object should be dropped from its parent
+def is_dropped(obj, rule):
+    for key, values in rule.drop_if.items():
+        value = obj.get(key)
+        if value is not None and str(value).strip() in values:
+            logging.debug(f"Dropping {rule.name} with {key} '{value}'")
+            return True
+    return False
+
+def apply_rule(obj, rule):
+    """Clean obj in place according to rule. Returns None if the object itself should be dropped."""
+    if is_dropped(obj, rule):
+        return None
+
+    for key in rule.remove_keys:
+        obj.pop(key, None)
+    obj.update(rule.set_keys)
+
+    for key, mapping in rule.rename.items():
+        new_value = mapping.get(obj.get(key))
+        if new_value is not None:
+            logging.debug(f"Replacing {rule.name} {key} '{obj[key]}' with '{new_value}'")
+            obj[key] = new_value
+
+    for key, child_rule in rule.children.items():
+        child = obj.get(key)
+        if isinstance(child, list):
+            obj[key] = [item for item in (apply_rule(item, child_rule) if isinstance(item, dict) else item
+                                          for item in child) if item is not None]
+        elif isinstance(child, dict) and apply_rule(child, child_rule) is None:
+            obj.pop(key)
+
+    return obj
+
+# The compiled rules handed to each worker process once, rather than with every payload
+_worker_rule = None
+
+def _init_worker(rule):
+    global _worker_rule
+    _worker_rule = rule
+
+def _apply_worker_rule(obj):
+    return apply_rule(obj, _worker_rule)
+
+def transform_all(payloads, rule, processes=None, chunksize=64):
+    """Apply rule to every payload. With processes > 1 the batch is spread over a process pool."""
+    if not processes or processes <= 1:
+        return [apply_rule(payload, rule) for payload in payloads]
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(rule,)) as executor:
+        return list(executor.map(_apply_worker_rule, payloads, chunksize=chunksize))
@@ -0,0 +1,127 @@
+import csv
+import logging
+import re
+
+# Local checks for payloads the creators are about to send, against a target schema from target_schema.py.
+# Each validator returns a list of (severity, message): 'error' means the API would answer 400,
+# 'warning' means the payload will be accepted but not as exported.
+
+# Valid property fieldType values for each property type
+FIELD_TYPES_BY_TYPE = {
+    'bool': {'booleancheckbox', 'calculation_equation'},
+    'enumeration': {'booleancheckbox', 'checkbox', 'radio', 'select', 'calculation_equation'},
+    'date': {'date'},
+    'datetime': {'date'},
+    'string': {'file', 'text', 'textarea', 'calculation_equation', 'html', 'phonenumber'},
+    'number': {'number', 'calculation_equation'},
+    'phone_number': {'phonenumber'},
+}
+OPTION_FIELD_TYPES = {'checkbox', 'radio', 'select'}  # Enumeration field types that need options
+EMAIL_TOKEN_PATTERN = re.compile(r"\bcontact\.([A-Za-z0-9_]+)")
+
+def validate_property(property_data, schema):
+    issues = []
+    for key in ('name', 'label', 'type', 'fieldType', 'groupName'):
+        if not property_data.get(key):
+            issues.append(('error', f"missing {key}"))
+
+    prop_type, field_type = property_data.get('type'), property_data.get('fieldType')
+    if prop_type and prop_type not in FIELD_TYPES_BY_TYPE:
+        issues.append(('error', f"unknown type '{prop_type}'"))
+    elif prop_type and field_type and field_type not in FIELD_TYPES_BY_TYPE[prop_type]:
+        issues.append(('error', f"fieldType '{field_type}' is not valid for type '{prop_type}'"))
+
+    options = property_data.get('options') or []
+    if prop_type == 'enumeration' and field_type in OPTION_FIELD_TYPES and not options:
+        issues.append(('error', f"{field_type} property has no options"))
+    values = [option.get('value') for option in options]
+    duplicates = sorted({str(value) for value in values if values.count(value) > 1})
+    if duplicates:
+        issues.append(('error', f"duplicate option values {', '.join(duplicates)}"))
+
+    group_name = property_data.get('groupName')
+    if group_name and group_name not in schema['groups']:
+        issues.append(('error', f"group '{group_name}' does not exist in the target"))
+    if property_data.get('name') in schema['properties']:
+        issues.append(('warning', "property already exists in the target"))
+    return issues
+
+def validate_form(form_data, schema):
+    issues = []
+    if not form_data.get('name'):
+        issues.append(('error', "missing name"))
+
+    groups = form_data.get('formFieldGroups', [])
+    if not any(group.get('fields') for group in groups):
+        issues.append(('warning', "form has no fields"))
+
+    pending = [field for group in groups for field in group.get('fields', [])]
+    while pending:
+        field = pending.pop()
+        name = field.get('name')
+        if not name:
+            issues.append(('error', "field without a name"))
+        elif name not in schema['properties']:
+            issues.append(('error', f"field '{name}' has no matching property in the target"))
+        elif field.get('fieldType') and field['fieldType'] != schema['properties'][name]['fieldType']:
+            issues.append(('warning', f"field '{name}' is a {field['fieldType']} but the target property is a {schema['properties'][name]['fieldType']}"))
+
+        if isinstance(field.get('dependentFormField'), dict):
+            pending.append(field['dependentFormField'])
+        for dependent_filter in field.get('dependentFieldFilters', []) or []:
+            if isinstance(dependent_filter.get('dependentFormField'), dict):
+                pending.append(dependent_filter['dependentFormField'])
+    return issues
+
+def validate_workflow(workflow_data, supported_action_type_ids, branch_action_types):
+    issues = []
+    if not workflow_data.get('name'):
+        issues.append(('error', "missing name"))
+    for action in workflow_data.get('actions', []):
+        if action.get('type') not in branch_action_types and action.get('actionTypeId') not in supported_action_type_ids:
+            issues.append(('warning', f"action {action.get('actionId')} has unsupported actionTypeId {action.get('actionTypeId')} and will be dropped"))
+    return issues
+
+def validate_email(email_data, schema):
+    issues = []
+    if not email_data.get('name'):
+        issues.append(('error', "missing name"))
+    if not email_data.get('subject'):
+        issues.append(('warning', "missing subject"))
+
+    # Personalization tokens must point at properties that exist in the target
+    tokens = set()
+    pending = [email_data]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, dict):
+            pending.extend(current.values())
+        elif isinstance(current, list):
+            pending.extend(current)
+        elif isinstance(current, str) and 'contact.' in current:
+            tokens.update(EMAIL_TOKEN_PATTERN.findall(current))
+    for token in sorted(tokens - set(schema['properties'])):
+        issues.append(('error', f"personalization token contact.{token} has no matching property in the target"))
+    return issues
+
+def write_report(results, report_file):
+    """Write (asset_type, asset_name, issues) results to report_file and print a summary. Returns the error count."""
+    errors = warnings = 0
+    with open(report_file, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Asset Type', 'Asset', 'Severity', 'Message'])
+        for asset_type, asset_name, issues in results:
+            for severity, message in issues:
+                writer.writerow([asset_type, asset_name, severity, message])
+                if severity == 'error':
+                    errors += 1
+                    print(f"  {asset_type} '{asset_name}': {message}")
+                else:
+                    warnings += 1
+
+    failing = sum(1 for _, _, issues in results if any(severity == 'error' for severity, _ in issues))
+    summary = (f"Dry run: {len(results)} payloads checked, {failing} would be rejected "
+               f"({errors} errors, {warnings} warnings). Full report in {report_file}")
+    logging.info(summary)
+    print(summary)
+    return errors
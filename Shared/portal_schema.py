@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from hubspot_http import get_session, request_with_retries
+
+# Property and property group schema of a portal, for standard and custom objects, in one normalized document
+BASE_API_URL = 'https://api.hubapi.com'
+STANDARD_OBJECT_TYPES = ['contacts', 'companies', 'deals', 'tickets']
+SCHEMA_WORKERS = 8  # Requests in flight at once; each object needs one for properties and one for groups
+
+# Property keys kept in the schema file; everything else is portal bookkeeping that differs between portals
+PROPERTY_KEYS = ['name', 'label', 'type', 'fieldType', 'groupName', 'description', 'displayOrder',
+                 'hidden', 'formField', 'hasUniqueValue', 'calculated', 'externalOptions', 'hubspotDefined']
+OPTION_KEYS = ['label', 'value', 'description', 'displayOrder', 'hidden']
+GROUP_KEYS = ['name', 'label', 'displayOrder']
+
+def normalize_property(property_data):
+    normalized = {key: property_data[key] for key in PROPERTY_KEYS if property_data.get(key) not in (None, '')}
+    options = property_data.get('options') or []
+    if options:
+        normalized['options'] = [{key: option[key] for key in OPTION_KEYS if option.get(key) not in (None, '')} for option in options]
+    return normalized
+
+def normalize_group(group_data):
+    return {key: group_data[key] for key in GROUP_KEYS if group_data.get(key) not in (None, '')}
+
+# Function to GET one schema endpoint and return its results, through the portal's SchemaCache when given
+def fetch_results(api_key, path, cache=None, object_type='portal'):
+    if cache is not None:
+        return cache.get(f"{BASE_API_URL}{path}", object_type=object_type).get('results', [])
+
+    session = get_session(api_key)
+    response = request_with_retries(session, 'GET', f"{BASE_API_URL}{path}")
+    if response.status_code != 200:
+        raise Exception(f"Error fetching {path}: {response.status_code} - {response.text}")
+    return response.json().get('results', [])
+
+# Function to list the custom object types of a portal as {objectTypeId: name}
+def fetch_custom_object_types(api_key, cache=None):
+    return {schema['objectTypeId']: schema.get('name') for schema in fetch_results(api_key, '/crm/v3/schemas', cache, 'schemas')}
+
+def fetch_portal_schema(api_key, object_types=None, workers=SCHEMA_WORKERS, cache=None):
+    """Fetch properties and groups for every object type concurrently and return the normalized schema.
+
+    object_types defaults to the standard objects plus every custom object in the portal.
+    Properties and groups are sorted by name, so two exports of an unchanged portal are identical.
+    With a SchemaCache, unchanged endpoints are served from disk after a conditional GET.
+    """
+    if object_types is None:
+        custom_object_types = fetch_custom_object_types(api_key, cache)
+        object_types = STANDARD_OBJECT_TYPES + sorted(custom_object_types)
+    else:
+        custom_object_types = {}
+
+    paths = [(object_type, kind, f"/crm/v3/properties/{object_type}{'/groups' if kind == 'groups' else ''}")
+             for object_type in object_types for kind in ('properties', 'groups')]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda path: fetch_results(api_key, path[2], cache, path[0]), paths))
+
+    objects = {object_type: {'properties': [], 'groups': []} for object_type in object_types}
+    for (object_type, kind, _), items in zip(paths, results):
+        normalize = normalize_property if kind == 'properties' else normalize_group
+        objects[object_type][kind] = sorted((normalize(item) for item in items), key=lambda item: item['name'])
+    for object_type, name in custom_object_types.items():
+        objects[object_type]['name'] = name
+
+    logging.info(f"Fetched {sum(len(obj['properties']) for obj in objects.values())} properties for {len(objects)} object types")
+    return {'objects': objects}
+
+def save_schema(schema, path):
+    # Compact separators keep multi-object schemas small; os.replace keeps the previous file until the new one is complete
+    temp_file = path + '.tmp'
+    with open(temp_file, 'w') as file:
+        json.dump(schema, file, separators=(',', ':'), sort_keys=True)
+    os.replace(temp_file, path)
+
+def load_schema(path):
+    with open(path, 'r') as file:
+        return json.load(file)
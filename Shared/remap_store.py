@@ -0,0 +1,95 @@
+import copy
+import sqlite3
+import threading
+import time
+
+# Persistent record of which target ID each migrated asset was given, so later stages can rewrite
+# references to it without searching the target portal by name
+DEFAULT_DB = 'id_remap.db'
+
+class RemapStore:
+    """Map (asset type, source portal, source ID) to the ID the asset was created with in the target.
+
+    Every mapping is held in a dict as well as in SQLite, so lookups are O(1) and never touch the disk.
+    Writes commit immediately, so mappings survive a run that stops halfway. Safe to share between threads.
+    """
+
+    def __init__(self, path=DEFAULT_DB):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS remap (
+                asset_type TEXT NOT NULL, source_portal TEXT NOT NULL, source_id TEXT NOT NULL,
+                target_id TEXT NOT NULL, created_at REAL NOT NULL,
+                PRIMARY KEY (asset_type, source_portal, source_id)
+            ) WITHOUT ROWID
+        """)
+        self.lock = threading.Lock()
+        self.mappings = {
+            (asset_type, source_portal, source_id): target_id
+            for asset_type, source_portal, source_id, target_id
+            in self.connection.execute("SELECT asset_type, source_portal, source_id, target_id FROM remap")
+        }
+
+    def record(self, asset_type, source_portal, source_id, target_id):
+        if source_id is None or target_id is None:
+            return
+        key = (asset_type, source_portal, str(source_id))
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO remap VALUES (?, ?, ?, ?, ?)",
+                (*key, str(target_id), time.time())
+            )
+            self.connection.commit()
+            self.mappings[key] = str(target_id)
+
+    def lookup(self, asset_type, source_portal, source_id):
+        return self.mappings.get((asset_type, source_portal, str(source_id)))
+
+    def rewrite(self, payload, source_portal, key_types):
+        """Return a copy of payload with every mapped reference replaced by its target ID.
+
+        key_types maps a payload key (such as 'formId') to the asset type its values refer to.
+        Also returns the (asset_type, source_id) pairs that had no mapping, in the order found.
+        """
+        payload = copy.deepcopy(payload)
+        unmapped = []
+        stack = [payload]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, list):
+                stack.extend(item for item in current if isinstance(item, (dict, list)))
+                continue
+            if not isinstance(current, dict):
+                continue
+
+            for key, value in current.items():
+                asset_type = key_types.get(key)
+                if asset_type is None or isinstance(value, dict):
+                    if isinstance(value, (dict, list)):
+                        stack.append(value)
+                elif isinstance(value, list):
+                    current[key] = [self._remap(asset_type, source_portal, item, unmapped) for item in value]
+                else:
+                    current[key] = self._remap(asset_type, source_portal, value, unmapped)
+        return payload, unmapped
+
+    def _remap(self, asset_type, source_portal, value, unmapped):
+        if value is None or value == '' or isinstance(value, (dict, list, bool)):
+            return value
+        target_id = self.mappings.get((asset_type, source_portal, str(value)))
+        if target_id is None:
+            unmapped.append((asset_type, value))
+            return value
+        # Keep numeric IDs numeric, since some endpoints reject a quoted number
+        return int(target_id) if isinstance(value, int) and target_id.isdigit() else target_id
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
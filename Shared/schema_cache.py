@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from hubspot_http import get_session, request_with_retries
+
+# On-disk cache of schema reads (properties, groups, forms, ...) for one portal, stored per object type.
+# Responses are kept with their ETag/Last-Modified validators and revalidated with conditional GETs.
+# Endpoints without validators are versioned by the updatedAt their list endpoint reports instead.
+CACHE_DIR = 'schema_cache'
+
+class SchemaCache:
+    """Read-through cache of GET responses and versioned items for one portal.
+
+    max_age is how many seconds an entry is trusted without asking the API at all. The default of 0
+    always revalidates, which costs a 304 per unchanged response; development runs can raise it to
+    skip even that.
+    """
+
+    def __init__(self, portal, api_key, cache_dir=CACHE_DIR, max_age=0):
+        self.root = os.path.join(cache_dir, portal)
+        self.api_key = api_key
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.items = {}  # object_type -> {item_id: {'version': ..., 'body': ...}}, loaded on first use
+        self.stats = {'fresh': 0, 'revalidated': 0, 'fetched': 0}
+
+    def _entry_path(self, object_type, url, params):
+        key = hashlib.sha1(json.dumps([url, sorted((params or {}).items())], default=str).encode('utf-8')).hexdigest()
+        return os.path.join(self.root, object_type, f"{key}.json")
+
+    def _count(self, outcome):
+        with self.lock:
+            self.stats[outcome] += 1
+
+    def get(self, url, params=None, object_type='portal'):
+        """Return the parsed JSON body of GET url, from the cache when the API confirms it is unchanged."""
+        path = self._entry_path(object_type, url, params)
+        entry = None
+        if os.path.exists(path):
+            with open(path, 'r') as file:
+                entry = json.load(file)
+
+        if entry and self.max_age and time.time() - entry['fetched_at'] < self.max_age:
+            self._count('fresh')
+            return entry['body']
+
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        response = request_with_retries(get_session(self.api_key), 'GET', url, params=params, headers=headers)
+        if response.status_code == 304 and entry:
+            self._count('revalidated')
+            entry['fetched_at'] = time.time()
+            self._write(path, entry)
+            return entry['body']
+        if response.status_code != 200:
+            raise Exception(f"Error fetching {url}: {response.status_code} - {response.text}")
+
+        self._count('fetched')
+        body = response.json()
+        self._write(path, {
+            'url': url,
+            'params': params,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+            'body': body,
+        })
+        return body
+
+    def get_item(self, object_type, item_id, version, fetch):
+        """Return the cached body of item_id if it was stored at this version, otherwise fetch(item_id).
+
+        version is the updatedAt (or revision) a list call reports for the item; None always fetches.
+        Call save() once done, so the versions are written in one go.
+        """
+        with self.lock:
+            if object_type not in self.items:
+                index_path = os.path.join(self.root, object_type, 'items.json')
+                if os.path.exists(index_path):
+                    with open(index_path, 'r') as file:
+                        self.items[object_type] = json.load(file)
+                else:
+                    self.items[object_type] = {}
+            cached = self.items[object_type].get(str(item_id))
+
+        if version is not None and cached and cached['version'] == version:
+            self._count('fresh')
+            return cached['body']
+
+        body = fetch(item_id)
+        self._count('fetched')
+        if body is not None:
+            with self.lock:
+                self.items[object_type][str(item_id)] = {'version': version, 'body': body}
+        return body
+
+    def save(self):
+        with self.lock:
+            for object_type, items in self.items.items():
+                self._write(os.path.join(self.root, object_type, 'items.json'), items)
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_file = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_file, 'w') as file:
+            json.dump(data, file, separators=(',', ':'))
+        os.replace(temp_file, path)
+
+    def summary(self):
+        return (f"schema cache: {self.stats['fresh']} fresh, {self.stats['revalidated']} revalidated, "
+                f"{self.stats['fetched']} fetched")
@@ -0,0 +1,49 @@
+# Comparison of property definitions between a source payload list and a target schema, by property name
+
+# Property attributes that are compared; type and fieldType cannot be changed safely once data exists
+COMPARED_KEYS = ['label', 'groupName']
+
+def option_signature(options):
+    """Options as an order-independent set of (value, label, hidden), so reordering alone is not a change."""
+    return {(option.get('value'), option.get('label'), bool(option.get('hidden'))) for option in options or []}
+
+def merge_options(source_options, target_options):
+    """Target options with the source's label and settings applied by value, then the source-only options.
+
+    A PATCH replaces the whole option list, so options that only exist in the target are kept.
+    """
+    source_by_value = {option.get('value'): option for option in source_options}
+    merged = [{**option, **source_by_value.get(option.get('value'), {})} for option in target_options or []]
+    target_values = {option.get('value') for option in target_options or []}
+    return merged + [option for option in source_options if option.get('value') not in target_values]
+
+def diff_properties(source_properties, target_properties):
+    """Sort source properties into (creates, updates, identical, protected) against the target's properties.
+
+    creates are the source payloads missing from the target. updates are (name, patch) pairs, where
+    patch holds only the label, groupName and merged options that differ. identical are the names left
+    alone. protected are (name, patch) pairs for HubSpot-defined properties, which are reported, never patched.
+    """
+    target_by_name = {prop['name']: prop for prop in target_properties}
+    creates, updates, identical, protected = [], [], [], []
+
+    for prop in source_properties:
+        target = target_by_name.get(prop['name'])
+        if target is None:
+            creates.append(prop)
+            continue
+
+        patch = {key: prop[key] for key in COMPARED_KEYS if prop.get(key) and prop.get(key) != target.get(key)}
+        if prop.get('options'):
+            options = merge_options(prop['options'], target.get('options'))
+            if option_signature(options) != option_signature(target.get('options')):
+                patch['options'] = options
+
+        if not patch:
+            identical.append(prop['name'])
+        elif target.get('hubspotDefined'):
+            protected.append((prop['name'], patch))
+        else:
+            updates.append((prop['name'], patch))
+
+    return creates, updates, identical, protected
@@ -0,0 +1,45 @@
+from hubspot_http import get_session, request_with_retries
+from schema_cache import SchemaCache
+
+# Snapshot of what already exists in a target portal: contact properties and groups, form and email IDs.
+# Creators validate payloads against it with --dry-run. Every page is revalidated through the portal's
+# SchemaCache, so a dry run sees what was pushed since the last one at the cost of a 304 per page.
+BASE_API_URL = 'https://api.hubapi.com'
+
+# Function to GET a paged v3 endpoint and return every result, each page through the SchemaCache when given
+def fetch_all_results(session, path, params, cache=None, object_type='portal'):
+    results = []
+    while True:
+        if cache is not None:
+            data = cache.get(f"{BASE_API_URL}{path}", params=params, object_type=object_type)
+        else:
+            response = request_with_retries(session, 'GET', f"{BASE_API_URL}{path}", params=params)
+            if response.status_code != 200:
+                raise Exception(f"Error listing {path}: {response.status_code} - {response.text}")
+            data = response.json()
+        results.extend(data.get('results', []))
+
+        after = data.get('paging', {}).get('next', {}).get('after')
+        if not after:
+            return results
+        params = {**params, 'after': after}
+
+def fetch_target_schema(api_key, portal):
+    """Fetch the target snapshot, taking unchanged pages from the portal's SchemaCache."""
+    session = get_session(api_key)
+    cache = SchemaCache(portal, api_key)
+    properties = fetch_all_results(session, '/crm/v3/properties/contacts', {}, cache, 'contacts')
+    return {
+        'properties': {
+            prop['name']: {
+                'type': prop.get('type'),
+                'fieldType': prop.get('fieldType'),
+                'groupName': prop.get('groupName'),
+                'options': [option.get('value') for option in prop.get('options') or []],
+            }
+            for prop in properties
+        },
+        'groups': sorted(group['name'] for group in fetch_all_results(session, '/crm/v3/properties/contacts/groups', {}, cache, 'contacts')),
+        'forms': sorted(str(form['id']) for form in fetch_all_results(session, '/marketing/v3/forms', {'limit': 500, 'formTypes': 'all'}, cache, 'forms')),
+        'emails': sorted(str(email['id']) for email in fetch_all_results(session, '/marketing/v3/emails', {'limit': 100}, cache, 'emails')),
+    }
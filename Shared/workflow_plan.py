@@ -0,0 +1,80 @@
+from collections import defaultdict
+from workflow_refs import extract_references
+
+# Dependency planning for recreating workflows in another portal
+CHECKED_REFERENCE_TYPES = ('form', 'email')  # Must already exist in the target portal
+# Only contact properties are known, and a property reference does not say which object it is on;
+# misses are reported so company or deal properties do not stop the workflow from being attempted
+WARNED_REFERENCE_TYPES = ('property',)
+
+# Function to describe the references of the given types that are not in the target portal
+def missing_references(references, available, reference_types):
+    reasons = []
+    for reference_type in reference_types:
+        missing = [str(value) for value in references.get(reference_type, []) if str(value) not in available.get(reference_type, set())]
+        if missing:
+            reasons.append(f"missing {reference_type} {', '.join(missing)}")
+    return reasons
+
+def plan_workflows(workflows, available):
+    """Order workflows so each is created after the workflows it references.
+
+    workflows maps source workflow ID to definition. available maps each of CHECKED_REFERENCE_TYPES
+    and WARNED_REFERENCE_TYPES to the set of IDs (as strings) that exist in the target portal.
+    Returns (levels, blocked, warnings): levels is a list of lists of workflow IDs where every workflow
+    depends only on earlier levels, so a level can be created in parallel; blocked maps workflow ID to
+    the reasons it cannot be created; warnings maps workflow ID to references that may be missing.
+    """
+    workflow_ids = [str(workflow_id) for workflow_id in workflows]
+    known_ids = set(workflow_ids)
+    blocked = {}
+    warnings = {}
+    dependencies = {}
+    dependents = defaultdict(list)
+
+    for workflow_id, workflow_data in zip(workflow_ids, workflows.values()):
+        references = extract_references(workflow_data)
+
+        reasons = missing_references(references, available, CHECKED_REFERENCE_TYPES)
+        if reasons:
+            blocked[workflow_id] = reasons
+        possibly_missing = missing_references(references, available, WARNED_REFERENCE_TYPES)
+        if possibly_missing:
+            warnings[workflow_id] = possibly_missing
+
+        # Only workflows being migrated in the same run become edges; others are left to the API to check
+        dependencies[workflow_id] = {
+            str(value) for value in references.get('workflow', []) if str(value) in known_ids
+        } - {workflow_id}
+        for dependency in dependencies[workflow_id]:
+            dependents[dependency].append(workflow_id)
+
+    # Kahn's algorithm, one level at a time
+    remaining = {workflow_id: len(dependencies[workflow_id]) for workflow_id in workflow_ids}
+    ready = [workflow_id for workflow_id in workflow_ids if remaining[workflow_id] == 0]
+    levels = []
+
+    while ready:
+        level = []
+        next_ready = []
+        for workflow_id in ready:
+            blocked_dependencies = sorted(dependency for dependency in dependencies[workflow_id] if dependency in blocked)
+            if blocked_dependencies:
+                blocked.setdefault(workflow_id, []).append(f"depends on blocked workflow {', '.join(blocked_dependencies)}")
+            if workflow_id not in blocked:
+                level.append(workflow_id)
+
+            for dependent in dependents[workflow_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    next_ready.append(dependent)
+
+        if level:
+            levels.append(level)
+        ready = next_ready
+
+    for workflow_id in workflow_ids:
+        if remaining[workflow_id] > 0:
+            blocked.setdefault(workflow_id, []).append("part of a workflow dependency cycle")
+
+    return levels, blocked, warnings
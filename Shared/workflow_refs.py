@@ -0,0 +1,66 @@
+from itertools import chain
+
+# Reference extraction for automation v4 workflow definitions. Every key below names an entity
+# that has to exist in the target portal (and be remapped) before the workflow can be recreated.
+REFERENCE_KEYS = {
+    'formId': 'form',
+    'listId': 'list',
+    'listIds': 'list',
+    'ilsListId': 'list',
+    'property': 'property',
+    'propertyName': 'property',
+    'property_name': 'property',
+    'targetProperty': 'property',
+    'content_id': 'email',
+    'contentId': 'email',
+    'emailContentId': 'email',
+    'owner_id': 'owner',
+    'ownerId': 'owner',
+    'user_ids': 'owner',
+    'flow_id': 'workflow',
+    'flowId': 'workflow',
+}
+
+def iter_references(node):
+    """Yield (reference_type, value) for every reference under node, in document order.
+
+    node may be any part of a workflow definition (enrollment criteria, an action, a list of actions).
+    The walk uses one explicit stack instead of recursion, so deeply nested filter branches
+    neither hit the recursion limit nor build intermediate lists per level.
+    """
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            children = []
+            for key, value in current.items():
+                reference_type = REFERENCE_KEYS.get(key)
+                if reference_type is None or isinstance(value, dict):
+                    if isinstance(value, (dict, list)):
+                        children.append(value)
+                elif isinstance(value, list):
+                    for item in value:
+                        if isinstance(item, (dict, list)):
+                            children.append(item)
+                        elif item is not None and item != '':
+                            yield reference_type, item
+                elif value is not None and value != '':
+                    yield reference_type, value
+            stack.extend(reversed(children))
+        elif isinstance(current, list):
+            stack.extend(item for item in reversed(current) if isinstance(item, (dict, list)))
+
+def extract_references(workflow_data):
+    """Return every entity a workflow references, as {reference_type: [ids in first-seen order]}.
+
+    enrollmentCriteria and actions are each walked once; repeated IDs are kept only once.
+    """
+    references = {}
+    found = chain(
+        iter_references(workflow_data.get('enrollmentCriteria', {})),
+        iter_references(workflow_data.get('actions', []))
+    )
+    for reference_type, value in found:
+        # Dict keys keep insertion order, so they double as an ordered set
+        references.setdefault(reference_type, {})[value] = None
+    return {reference_type: list(values) for reference_type, values in references.items()}
@@ -1,8 +1,19 @@
-import requests
+import copy
 import json
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from hubspot_http import get_session, request_with_retries
+from workflow_plan import plan_workflows
+from workflow_refs import REFERENCE_KEYS, extract_references
+from remap_store import RemapStore
+from target_schema import fetch_target_schema
+from payload_validation import validate_workflow, write_report
+
 # Loads the .env file into the system environment
 load_dotenv()
 
@@ -15,6 +26,13 @@ if API_KEY_NEW_INSTANCE is None:
 
 # The URL to create a new workflow
 url = "https://api.hubapi.com/automation/v4/flows"
+CREATE_WORKERS = 8  # Workflows in the same dependency level created concurrently
+PLAN_ONLY = False  # True prints the creation plan and blocked workflows without creating anything
+SOURCE_PORTAL = 'gs'  # Key of the exported portal in the ID remap store
+TARGET_PORTAL = 'npsb'  # Key of the new instance in the shared schema cache
+REMAP_DB = 'id_remap.db'  # Source ID -> new ID of forms, emails and workflows already migrated
+DRY_RUN = '--dry-run' in sys.argv  # Validate the workflows against the target schema without creating anything
+DRY_RUN_REPORT = 'dry_run_workflows.csv'
 
 # Load the workflow data from the JSON file
 with open('hubspot_workflows.json', 'r') as json_file:
@@ -25,47 +43,116 @@ supported_action_type_ids = [
     "0-35", "0-1", "0-13", "0-4", "0-8", "0-9", "0-5", "0-3", "0-14"
 ]
 
-# Function to adjust actions and only include supported actionTypeIds
-def adjust_actions(actions):
-    adjusted_actions = []
-    previous_action_id = None  # Track the previous action to handle skipping
-
-    for index, action in enumerate(actions):
-        action_type_id = action.get("actionTypeId")
+# Branch actions have no actionTypeId; they are kept and their branch connections rewired
+branch_action_types = ["LIST_BRANCH", "STATIC_BRANCH", "AB_TEST_BRANCH"]
+
+# Generator of every connection of an action: the single next step and each branch's next step
+def iter_connections(action):
+    if isinstance(action.get('connection'), dict):
+        yield action['connection']
+    for branches_key in ('listBranches', 'staticBranches', 'splits'):
+        for branch in action.get(branches_key, []):
+            if isinstance(branch.get('connection'), dict):
+                yield branch['connection']
+    if isinstance(action.get('defaultBranch'), dict):
+        yield action['defaultBranch']
+
+# Function to adjust actions and only include supported actionTypeIds, keeping the graph intact
+def adjust_actions(actions, start_action_id=None):
+    actions_by_id = {str(action.get('actionId')): action for action in actions}
+    kept_ids = set()
+    for action_id, action in actions_by_id.items():
+        if action.get("type") in branch_action_types or action.get("actionTypeId") in supported_action_type_ids:
+            kept_ids.add(action_id)
+        else:
+            print(f"Skipping unsupported actionTypeId: {action.get('actionTypeId')}, actionId {action_id}")
+
+    # Each dropped action is replaced by its own successor; results are cached so every action is resolved once
+    resolved = {}
+
+    def resolve(action_id):
+        path = []
+        while action_id is not None and action_id not in kept_ids and action_id not in resolved:
+            path.append(action_id)
+            dropped = actions_by_id.get(action_id)
+            if dropped is None:
+                print(f"nextActionId {action_id} does not exist, the connection is removed.")
+                action_id = None
+                break
+            # An unsupported action has one way forward: its next step, or for a branch its default branch
+            successors = [connection.get('nextActionId') for connection in iter_connections(dropped)]
+            next_id = next((successor for successor in successors if successor is not None), None)
+            action_id = str(next_id) if next_id is not None else None
+            if action_id in path:
+                print(f"Unsupported actions {', '.join(path)} form a loop, the connection is removed.")
+                action_id = None
+                break
+        target = resolved.get(action_id, action_id)
+        for dropped_id in path:
+            resolved[dropped_id] = target
+        return target
 
-        # Skip actions with unsupported actionTypeIds
-        if action_type_id not in supported_action_type_ids:
-            print(f"Skipping unsupported actionTypeId: {action_type_id}, actionId {action.get('actionId')}")
+    adjusted_actions = []
+    for action in actions:
+        action_id = str(action.get('actionId'))
+        if action_id not in kept_ids:
             continue
 
-        # Get the nextActionId if it exists
-        next_action_id = action.get('connection', {}).get('nextActionId')
-
-        # If the previous action exists and the current action is valid, ensure continuity of nextActionId
-        if previous_action_id is not None:
-            adjusted_actions[-1]['connection']['nextActionId'] = action.get('actionId')
-            print(f"Set nextActionId {action.get('actionId')} for previous actionId {previous_action_id}.")
-
-        # Build the adjusted action object
-        adjusted_action = {
-            "actionId": action.get("actionId"),
-            "type": action.get("type"),
-            "actionTypeVersion": action.get("actionTypeVersion", 0),
-            "actionTypeId": action.get("actionTypeId"),
-            "fields": action.get("fields", {}),
-            "connection": {
-                "edgeType": action.get("connection", {}).get("edgeType", "STANDARD"),
-                "nextActionId": next_action_id  # Use only if explicitly defined
-            } if next_action_id else {"edgeType": "STANDARD"}  # Handle the last action or actions without nextActionId
-        }
+        if action.get("type") in branch_action_types:
+            adjusted_action = copy.deepcopy(action)
+        else:
+            # Build the adjusted action object
+            adjusted_action = {
+                "actionId": action.get("actionId"),
+                "type": action.get("type"),
+                "actionTypeVersion": action.get("actionTypeVersion", 0),
+                "actionTypeId": action.get("actionTypeId"),
+                "fields": action.get("fields", {}),
+                "connection": copy.deepcopy(action.get("connection", {"edgeType": "STANDARD"}))
+            }
+
+        # Point every edge, including branch edges, past any dropped actions
+        for connection in iter_connections(adjusted_action):
+            connection.setdefault("edgeType", "STANDARD")
+            next_action_id = connection.get('nextActionId')
+            if next_action_id is None:
+                continue
+            target = resolve(str(next_action_id))
+            if target is None:
+                del connection['nextActionId']  # The branch or chain now ends here
+            elif target != str(next_action_id):
+                connection['nextActionId'] = target
+                print(f"Set nextActionId {target} for actionId {action_id} (was {next_action_id}).")
 
         adjusted_actions.append(adjusted_action)
-        previous_action_id = action.get('actionId')  # Set the current action as the previous action for next iteration
 
-    return adjusted_actions
+    if start_action_id is not None:
+        start_action_id = resolve(str(start_action_id))
+    elif adjusted_actions:
+        start_action_id = str(adjusted_actions[0].get('actionId'))
+
+    # Validate that every kept action can still be reached from the start; unreachable ones would be rejected
+    reachable = set()
+    pending = [start_action_id] if start_action_id is not None else []
+    adjusted_by_id = {str(action.get('actionId')): action for action in adjusted_actions}
+    while pending:
+        action_id = pending.pop()
+        if action_id in reachable or action_id not in adjusted_by_id:
+            continue
+        reachable.add(action_id)
+        pending.extend(str(connection['nextActionId']) for connection in iter_connections(adjusted_by_id[action_id]) if connection.get('nextActionId') is not None)
+
+    unreachable = [action_id for action_id in adjusted_by_id if action_id not in reachable]
+    if unreachable:
+        print(f"Dropping actions not reachable from the start action: {', '.join(unreachable)}")
+        adjusted_actions = [action for action in adjusted_actions if str(action.get('actionId')) in reachable]
+
+    return adjusted_actions, start_action_id
 
 # Function to create a new workflow in the new instance
-def create_workflow_with_enrollment_and_actions(workflow_data):
+def create_workflow_with_enrollment_and_actions(workflow_id, workflow_data):
+    actions, start_action_id = adjust_actions(workflow_data.get('actions', []), workflow_data.get('startActionId'))  # Process actions before including
+
     # Prepare the payload with the necessary fields including enrollment criteria and actions
     payload = {
         "type": "CONTACT_FLOW",
@@ -75,27 +162,81 @@ def create_workflow_with_enrollment_and_actions(workflow_data):
         "name": f"Copy of {workflow_data['name']}",
         "description": workflow_data.get("description", "Created via API"),
         "enrollmentCriteria": workflow_data.get("enrollmentCriteria", {}),
-        "actions": adjust_actions(workflow_data.get('actions', []))  # Process actions before including
-    }
-
-    headers = {
-        'accept': "application/json",
-        'content-type': "application/json",
-        'authorization': f"Bearer {API_KEY_NEW_INSTANCE}"
+        "actions": actions
     }
+    if start_action_id is not None:
+        payload["startActionId"] = start_action_id
 
-    # Convert the payload to a JSON string
-    payload_json = json.dumps(payload)
-    
-    # Send the POST request to create the new workflow
-    response = requests.post(url, data=payload_json, headers=headers)
+    # Send the POST request to create the new workflow; only rate limits are retried, so it is never created twice
+    session = get_session(API_KEY_NEW_INSTANCE)
+    response = request_with_retries(session, 'POST', url, idempotent=False, json=payload)
     
     if response.status_code == 201:
         print(f"Successfully created workflow: {workflow_data['name']}")
+        # Recorded under the key of hubspot_workflows.json, which is what flowId references and the planner use
+        remap_store.record('workflow', SOURCE_PORTAL, workflow_id, response.json().get('id'))
+        return True
     else:
         print(f"Failed to create workflow: {workflow_data['name']}. Status code: {response.status_code}")
         print(response.text)
-
-# Iterate over each workflow and create it in the new instance
-for workflow_id, workflow_data in workflows.items():
-    create_workflow_with_enrollment_and_actions(workflow_data)
+        return False
+
+# Point references at the IDs that forms, emails and workflows were given in the new instance.
+# Property names carry over unchanged, so they are not remapped. The store is closed on every exit path.
+with RemapStore(REMAP_DB) as remap_store:
+    remap_key_types = {key: asset_type for key, asset_type in REFERENCE_KEYS.items() if asset_type != 'property'}
+    workflow_key_types = {key: asset_type for key, asset_type in REFERENCE_KEYS.items() if asset_type == 'workflow'}
+    workflows = {workflow_id: remap_store.rewrite(workflow_data, SOURCE_PORTAL, remap_key_types)[0] for workflow_id, workflow_data in workflows.items()}
+
+    # Plan the creation order up front, so workflows that cannot be created are reported without a POST.
+    schema = fetch_target_schema(API_KEY_NEW_INSTANCE, TARGET_PORTAL)
+    inventory = {'form': set(schema['forms']), 'email': set(schema['emails']), 'property': set(schema['properties'])}
+    levels, blocked, warnings = plan_workflows(workflows, inventory)
+    workflows_by_id = {str(workflow_id): workflow_data for workflow_id, workflow_data in workflows.items()}
+
+    if DRY_RUN:
+        write_report([
+            ('workflow', workflow_data.get('name'),
+             validate_workflow(workflow_data, supported_action_type_ids, branch_action_types)
+             + [('error', reason) for reason in blocked.get(workflow_id, [])]
+             + [('warning', f"{reason} among contact properties") for reason in warnings.get(workflow_id, [])])
+            for workflow_id, workflow_data in workflows_by_id.items()
+        ], DRY_RUN_REPORT)
+        exit()
+
+    for workflow_id, reasons in blocked.items():
+        print(f"Blocked workflow {workflow_id} ({workflows_by_id[workflow_id].get('name')}): {'; '.join(reasons)}")
+    # Properties on companies, deals and other objects are not in the inventory, so these workflows are still attempted
+    for workflow_id, reasons in warnings.items():
+        if workflow_id not in blocked:
+            print(f"Warning for workflow {workflow_id} ({workflows_by_id[workflow_id].get('name')}): {'; '.join(reasons)} among contact properties")
+    print(f"Planned {sum(len(level) for level in levels)} workflows in {len(levels)} dependency levels, {len(blocked)} blocked.")
+
+    if PLAN_ONLY:
+        for level_number, level in enumerate(levels, start=1):
+            print(f"Level {level_number}: {', '.join(workflows_by_id[workflow_id].get('name', workflow_id) for workflow_id in level)}")
+        exit()
+
+    # Create each level in parallel; a level only starts once every workflow it depends on has been attempted
+    failed_ids = set()
+    skipped_ids = set()
+    with ThreadPoolExecutor(max_workers=CREATE_WORKERS) as executor:
+        for level in levels:
+            # Workflows whose dependencies failed to create would only fail in turn
+            runnable = []
+            for workflow_id in level:
+                failed_dependencies = [str(value) for value in extract_references(workflows_by_id[workflow_id]).get('workflow', []) if str(value) in failed_ids | skipped_ids]
+                if failed_dependencies:
+                    print(f"Skipping workflow {workflows_by_id[workflow_id].get('name')}: depends on failed workflow {', '.join(failed_dependencies)}")
+                    skipped_ids.add(workflow_id)
+                else:
+                    runnable.append(workflow_id)
+
+            # Workflows created in earlier levels are now in the remap store, so references to them can be rewritten
+            level_workflows = [remap_store.rewrite(workflows_by_id[workflow_id], SOURCE_PORTAL, workflow_key_types)[0] for workflow_id in runnable]
+            results = list(executor.map(create_workflow_with_enrollment_and_actions, runnable, level_workflows))
+            failed_ids.update(workflow_id for workflow_id, created in zip(runnable, results) if not created)
+
+    planned_count = sum(len(level) for level in levels)
+    print(f"Created {planned_count - len(failed_ids) - len(skipped_ids)} workflows, {len(failed_ids)} failed, "
+          f"{len(skipped_ids)} skipped, {len(blocked)} blocked.")
@@ -1,7 +1,30 @@
 import os
-from hubspot import HubSpot
-from hubspot.crm.contacts import ApiException
 import requests
+from requests.adapters import HTTPAdapter
+
+# The contact, forms list and HubDB rows are all read with plain GETs, so a pooled requests
+# session replaces the hubspot SDK and its import cost on every cold start
+CONTACTS_API_URL = "https://api.hubapi.com/crm/v3/objects/contacts"
+
+# Module-level session so warm invocations reuse the open connection to api.hubapi.com
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+# Function to read contact properties by contact ID
+def get_contact_properties(access_token, contact_id, properties):
+    headers = {
+        'Authorization': f'Bearer {access_token}',
+        'Content-Type': 'application/json'
+    }
+
+    response = session.get(
+        f"{CONTACTS_API_URL}/{contact_id}",
+        headers=headers,
+        params={'properties': ','.join(properties)}
+    )
+    response.raise_for_status()
+
+    return response.json().get('properties', {})
 
 # Function to query HubDB and find the corresponding cmo_source using form_id
 def get_cmo_source_from_hubdb(access_token, form_id):
@@ -14,7 +37,7 @@ def get_cmo_source_from_hubdb(access_token, form_id):
         'Content-Type': 'application/json'
     }
 
-    response = requests.get(hubdb_url, headers=headers)
+    response = session.get(hubdb_url, headers=headers)
 
     if response.status_code != 200:
         raise Exception(f"Failed to retrieve HubDB table. Status code: {response.status_code}")
@@ -46,16 +69,13 @@ def main(event):
             }
         }
 
-    # Instantiate HubSpot client with OAuth token
-    hubspot = HubSpot(access_token=access_token)
-
     phone = ''
     try:
         # Retrieve the contact's phone number using the contact ID from the event
         contact_id = event.get('object').get('objectId')
-        ApiResponse = hubspot.crm.contacts.basic_api.get_by_id(contact_id, properties=["phone"])
-        phone = ApiResponse.properties.get('phone')
-    except ApiException as e:
+        contact_properties = get_contact_properties(access_token, contact_id, ["phone"])
+        phone = contact_properties.get('phone')
+    except requests.exceptions.RequestException as e:
         print(f"Error fetching contact phone number: {e}")
         raise
 
@@ -78,7 +98,7 @@ def main(event):
 
     # Step 1: Get all forms from HubSpot Forms API using the token from secrets
     forms_url = "https://api.hubapi.com/forms/v2/forms"
-    response = requests.get(forms_url, headers=headers)
+    response = session.get(forms_url, headers=headers)
 
     if response.status_code != 200:
         return {
@@ -4,6 +4,12 @@ import json
 import csv  # Import CSV library for reading and writing CSV files
 from dotenv import load_dotenv
 import os
+import sys
+
+# Shared helpers live in the top-level Shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Shared'))
+from hubspot_flows import iter_flow_summaries, iter_flow_definitions
+from workflow_refs import extract_references
 
 # Loads the .env file into the system environment
 load_dotenv()
@@ -12,6 +18,9 @@ load_dotenv()
 API_KEY = os.getenv('GS_API_KEY')   # Replace with your actual API key
 BASE_API_URL = 'https://api.hubapi.com'  # Base URL for HubSpot API
 WORKFLOW_IDS_CSV = 'workflow_ids.csv'  # The CSV file containing workflow IDs
+DISCOVER_WORKFLOWS = False  # True lists every workflow in the portal instead of reading WORKFLOW_IDS_CSV
+MANIFEST_FILE = 'workflow_export_manifest.json'  # Revision and last fetched body of each exported workflow
+INCREMENTAL = True  # Re-fetch only workflows whose revision changed since the last run; False re-fetches everything
 
 # Configure logging
 logging.basicConfig(
@@ -20,52 +29,9 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-# Function to fetch workflow details
-def fetch_workflow_details(workflow_id):
-    url = f'{BASE_API_URL}/automation/v4/flows/{workflow_id}'
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {API_KEY}'
-    }
-
-    logging.debug(f"Fetching workflow data from {url}")  # Log the URL being fetched
-    response = requests.get(url, headers=headers)
-
-    # Check for HTTP errors
-    if response.status_code != 200:
-        logging.error(f"Error fetching workflow {workflow_id}: {response.status_code} - {response.text}")
-        return None
-
-    try:
-        data = response.json()  # Attempt to parse JSON
-    except requests.exceptions.JSONDecodeError:
-        logging.error(f"Failed to parse JSON response from {url}. Response text: {response.text}")
-        return None
-
-    logging.debug(f"Workflow {workflow_id} fetched successfully")
-    return data
-
-# Recursive function to extract formIds from the nested enrollment criteria
-def extract_form_ids_from_branch(branch):
-    form_ids = []
-    if 'filters' in branch:
-        for filter_item in branch['filters']:
-            if 'formId' in filter_item:
-                form_ids.append(filter_item['formId'])
-    
-    if 'filterBranches' in branch:
-        for sub_branch in branch['filterBranches']:
-            form_ids.extend(extract_form_ids_from_branch(sub_branch))  # Recursively search sub-branches
-    
-    return form_ids
-
-# Function to extract formIds from the enrollment criteria in workflow data
+# Function to extract formIds from the enrollment criteria and actions in workflow data
 def extract_form_ids(workflow_data):
-    form_ids = []
-    if 'enrollmentCriteria' in workflow_data and 'listFilterBranch' in workflow_data['enrollmentCriteria']:
-        main_branch = workflow_data['enrollmentCriteria']['listFilterBranch']
-        form_ids = extract_form_ids_from_branch(main_branch)
-    return form_ids
+    return extract_references(workflow_data).get('form', [])
 
 # Function to fetch form details using the forms API
 def fetch_form_details(form_id):
@@ -105,43 +71,103 @@ def read_workflow_ids_from_csv(csv_file):
         logging.error(f"File {csv_file} not found.")
     return workflow_ids
 
+# Function to load the manifest written by the previous run
+def load_manifest():
+    if not INCREMENTAL or not os.path.exists(MANIFEST_FILE):
+        return {'workflows': {}, 'forms': {}}
+    with open(MANIFEST_FILE, 'r') as file:
+        return json.load(file)
+
+# Function to save the manifest atomically, so an interrupted run never leaves it half written
+def save_manifest(manifest):
+    temp_file = MANIFEST_FILE + '.tmp'
+    with open(temp_file, 'w') as file:
+        json.dump(manifest, file)
+    os.replace(temp_file, MANIFEST_FILE)
+
+# A workflow is re-fetched when the revision the flows list reports differs from the manifest
+def revision_of(summary):
+    return [summary.get('revisionId'), summary.get('updatedAt')]
+
+# Function to fetch the workflows to process, taking unchanged ones from the manifest.
+# Returns the workflows and the IDs that were fetched fresh in this run.
+def load_workflows(manifest):
+    try:
+        # Listing is cheap (100 flows per request) and carries each flow's revision
+        summaries = list(iter_flow_summaries(API_KEY))
+        if not DISCOVER_WORKFLOWS:
+            workflow_ids = read_workflow_ids_from_csv(WORKFLOW_IDS_CSV)
+            summaries_by_id = {str(summary['id']): summary for summary in summaries}
+            for workflow_id in workflow_ids:
+                if str(workflow_id) not in summaries_by_id:
+                    logging.info(f"No data found for workflow ID: {workflow_id}")
+            summaries = [summaries_by_id[str(workflow_id)] for workflow_id in workflow_ids if str(workflow_id) in summaries_by_id]
+
+        cached = manifest['workflows']
+        changed_ids = [
+            str(summary['id']) for summary in summaries
+            if str(summary['id']) not in cached
+            or revision_of(summary) == [None, None]
+            or cached[str(summary['id'])]['revision'] != revision_of(summary)
+        ]
+        logging.info(f"{len(changed_ids)} of {len(summaries)} workflows changed since the last export")
+        fetched = {str(workflow['id']): workflow for workflow in iter_flow_definitions(API_KEY, changed_ids)}
+    except Exception as e:
+        logging.error(f"Error fetching workflows: {e}")
+        return [], set()
+
+    workflows = []
+    entries = {}
+    for summary in summaries:
+        workflow_id = str(summary['id'])
+        if workflow_id in fetched:
+            workflow_data = fetched[workflow_id]
+        elif workflow_id not in changed_ids:
+            workflow_data = cached[workflow_id]['body']
+        else:
+            logging.info(f"No data found for workflow ID: {workflow_id}")
+            continue
+        workflows.append(workflow_data)
+        entries[workflow_id] = {'revision': revision_of(summary), 'body': workflow_data}
+
+    # Workflows that were deleted or dropped from the CSV leave the manifest
+    manifest['workflows'] = entries
+    return workflows, set(fetched)
+
 def main():
-    all_workflows = []  # List to store all workflow details
     csv_data = []  # List to store CSV rows (workflow name, form ID, form GUID, and form name)
 
-    # Read workflow IDs from the CSV file
-    workflow_ids = read_workflow_ids_from_csv(WORKFLOW_IDS_CSV)
+    manifest = load_manifest()
+    all_workflows, fetched_ids = load_workflows(manifest)  # List of all workflow details
+    form_cache = manifest['forms']
+    refreshed_form_ids = set()  # Forms already fetched in this run
 
-    if not workflow_ids:
-        logging.error("No workflow IDs found.")
+    if not all_workflows:
+        logging.error("No workflows found.")
         return
 
-    for workflow_id in workflow_ids:
-        logging.info(f"Processing workflow ID: {workflow_id}")  # Log the workflow ID being processed
-        workflow_data = fetch_workflow_details(workflow_id)
-
-        if workflow_data:
-            all_workflows.append(workflow_data)
-
-            # Extract the name and formId(s) from the workflow
-            workflow_name = workflow_data.get('name', 'Unnamed Workflow')
-            form_ids = extract_form_ids(workflow_data)
-            
-            if form_ids:
-                for form_id in form_ids:
-                    # Fetch additional form details (name and guid)
+    for workflow_data in all_workflows:
+        logging.info(f"Processing workflow ID: {workflow_data.get('id')}")  # Log the workflow ID being processed
+
+        # Extract the name and formId(s) from the workflow
+        workflow_name = workflow_data.get('name', 'Unnamed Workflow')
+        form_ids = extract_form_ids(workflow_data)
+        
+        if form_ids:
+            for form_id in form_ids:
+                # Fetch additional form details (name and guid); unchanged workflows reuse the last run's details
+                form_details = form_cache.get(str(form_id))
+                if form_details is None or (str(workflow_data.get('id')) in fetched_ids and str(form_id) not in refreshed_form_ids):
+                    refreshed_form_ids.add(str(form_id))
                     form_data = fetch_form_details(form_id)
                     if form_data:
-                        form_guid = form_data.get('guid', 'Unknown GUID')
-                        form_name = form_data.get('name', 'Unknown Name')
-                        csv_data.append([workflow_name, form_id, form_guid, form_name])
-                    else:
-                        csv_data.append([workflow_name, form_id, 'Unknown GUID', 'Unknown Name'])
-            else:
-                csv_data.append([workflow_name, 'No formId found', 'N/A', 'N/A'])
-
+                        form_details = form_cache[str(form_id)] = {'guid': form_data.get('guid', 'Unknown GUID'), 'name': form_data.get('name', 'Unknown Name')}
+                if form_details:
+                    csv_data.append([workflow_name, form_id, form_details['guid'], form_details['name']])
+                else:
+                    csv_data.append([workflow_name, form_id, 'Unknown GUID', 'Unknown Name'])
         else:
-            logging.info(f"No data found for workflow ID: {workflow_id}")
+            csv_data.append([workflow_name, 'No formId found', 'N/A', 'N/A'])
 
     # Export all workflow data to a JSON file
     if all_workflows:
@@ -159,5 +185,8 @@ def main():
 
     logging.info("CSV data saved to workflow_formIds_forms.csv")
 
+    save_manifest(manifest)
+    logging.info(f"Manifest saved to {MANIFEST_FILE}")
+
 if __name__ == "__main__":
     main()
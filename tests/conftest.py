@@ -0,0 +1,49 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+import requests
+
+# The scripts import their helpers from the top-level Shared folder; the tests do the same
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(REPO_DIR, 'Shared'))
+
+@pytest.fixture
+def load_script(tmp_path, monkeypatch):
+    """Import a script by its path relative to the repo, from inside tmp_path so its log and output files land there."""
+    monkeypatch.chdir(tmp_path)
+
+    def load(relative_path):
+        path = os.path.join(REPO_DIR, relative_path)
+        name = os.path.splitext(os.path.basename(path))[0].replace('-', '_')
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return load
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.text = '' if body is None else str(body)
+
+    def json(self):
+        return self.body
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """Route every requests call to handler(method, url, params, headers, json) and record the calls."""
+    calls = []
+
+    def install(handler):
+        def request(self, method, url, params=None, headers=None, json=None, **kwargs):
+            calls.append((method, url, params, dict(headers or {}), json))
+            return handler(method, url, params, dict(headers or {}), json)
+        monkeypatch.setattr(requests.Session, 'request', request)
+        return calls
+
+    return install
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from remap_store import RemapStore
+
+@pytest.mark.parametrize('script, portal', [
+    ('Forms/create-forms-np-gs.py', 'gs'),
+    ('Forms/create-forms-np-mip.py', 'mip'),
+])
+def test_created_form_is_recorded_under_its_source_guid(load_script, tmp_path, script, portal):
+    module = load_script(script)
+    (tmp_path / 'field_mappings.csv').write_text(f"{portal}_internal_name,external_name\nemail,email\n")
+    (tmp_path / 'forms.json').write_text(json.dumps([
+        {'guid': 'abc', 'name': 'Contact us', 'formFieldGroups': [{'fields': [{'name': 'email'}]}]},
+    ]))
+    module.JSON_FILE = str(tmp_path / 'forms.json')
+    module.REMAP_DB = str(tmp_path / 'id_remap.db')
+
+    posted = []
+    def create_form(form_data):
+        posted.append(form_data)
+        return {'guid': 'new-abc'}
+    module.create_form = create_form
+
+    module.main()
+
+    assert 'guid' not in posted[0]
+    with RemapStore(module.REMAP_DB) as remap_store:
+        assert remap_store.lookup('form', portal, 'abc') == 'new-abc'
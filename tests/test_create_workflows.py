@@ -0,0 +1,30 @@
+import json
+
+from conftest import FakeResponse
+from remap_store import RemapStore
+
+def test_workflows_are_recorded_under_their_export_key(load_script, fake_api, tmp_path, monkeypatch):
+    monkeypatch.setenv('NPSB_API_KEY', 'key')
+    monkeypatch.setattr('sys.argv', ['create-workflows.py'])
+    # Neither body carries an id; the second workflow enrolls contacts into the first
+    (tmp_path / 'hubspot_workflows.json').write_text(json.dumps({
+        '10': {'name': 'First', 'actions': []},
+        '20': {'name': 'Second', 'startActionId': '1',
+               'actions': [{'actionId': '1', 'actionTypeId': '0-4', 'fields': {'flow_id': '10'}}]},
+    }))
+
+    posted = []
+    def handler(method, url, params, headers, json):
+        if method == 'POST':
+            posted.append(json)
+            return FakeResponse(201, {'id': f"new-{len(posted)}"})
+        return FakeResponse(200, {'results': []})
+    fake_api(handler)
+
+    load_script('Workflows/create-workflows.py')
+
+    assert [payload['name'] for payload in posted] == ['Copy of First', 'Copy of Second']
+    assert posted[1]['actions'][0]['fields']['flow_id'] == 'new-1'
+    with RemapStore(str(tmp_path / 'id_remap.db')) as remap_store:
+        assert remap_store.lookup('workflow', 'gs', '10') == 'new-1'
+        assert remap_store.lookup('workflow', 'gs', '20') == 'new-2'
@@ -0,0 +1,54 @@
+import time
+from email.utils import formatdate
+
+import requests
+
+import hubspot_http
+from conftest import FakeResponse
+
+def test_http_date_retry_after_is_retried(load_script, fake_api, monkeypatch):
+    hubdb_client = load_script('HubDB/hubdb_client.py')
+    monkeypatch.setattr(hubspot_http.time, 'sleep', lambda seconds: None)
+    responses = [FakeResponse(429, headers={'Retry-After': formatdate(time.time() + 2, usegmt=True)}), FakeResponse(200, {})]
+    fake_api(lambda *args: responses.pop(0))
+
+    assert hubdb_client.request(requests.Session(), 'GET', 'https://api.hubapi.com/x').status_code == 200
+
+def test_batch_rows_counts_failed_chunks(load_script, fake_api):
+    hubdb_client = load_script('HubDB/hubdb_client.py')
+
+    def handler(method, url, params, headers, json):
+        # The second chunk is rejected outright, the third partly
+        first_row = json['inputs'][0]['values']['n']
+        if first_row == 100:
+            return FakeResponse(400, {'message': 'bad row'})
+        if first_row == 200:
+            return FakeResponse(207, {'results': [], 'errors': [{'message': 'bad'}, {'message': 'bad'}]})
+        return FakeResponse(201, {'results': []})
+    fake_api(handler)
+
+    rows = ({'values': {'n': n}} for n in range(250))
+    assert hubdb_client.batch_rows(requests.Session(), 'table', 'create', rows) == (148, 102)
+
+def test_option_cells_use_target_option_ids_by_name(load_script):
+    hubdb_client = load_script('HubDB/hubdb_client.py')
+    target_table = {'columns': [
+        {'name': 'cmo_source', 'type': 'SELECT', 'options': [{'id': '7', 'name': 'webinar', 'type': 'option'}]},
+        {'name': 'tags', 'type': 'MULTISELECT', 'options': [{'id': '3', 'name': 'a', 'type': 'option'}]},
+        {'name': 'form_id', 'type': 'TEXT'},
+    ]}
+    row = {'path': 'p', 'values': {
+        'cmo_source': {'id': 2, 'name': 'webinar', 'label': 'Webinar', 'type': 'option'},
+        'tags': [{'id': 1, 'name': 'a', 'type': 'option'}, {'id': 9, 'name': 'new', 'type': 'option'}],
+        'form_id': 'abc',
+    }}
+
+    assert hubdb_client.row_input(row, hubdb_client.column_options(target_table)) == {'path': 'p', 'values': {
+        'cmo_source': {'id': '7', 'name': 'webinar', 'type': 'option'},
+        'tags': [{'id': '3', 'name': 'a', 'type': 'option'}, {'name': 'new', 'type': 'option'}],
+        'form_id': 'abc',
+    }}
+
+def test_shared_pooled_session_is_used(load_script):
+    hubdb_client = load_script('HubDB/hubdb_client.py')
+    assert hubdb_client.get_session is hubspot_http.get_session
@@ -0,0 +1,41 @@
+import pytest
+import requests
+
+import hubspot_http
+from conftest import FakeResponse
+from hubspot_http import request_with_retries
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(hubspot_http.time, 'sleep', lambda seconds: None)
+
+@pytest.mark.parametrize('status', [500, 502, 504])
+def test_create_is_not_resent_after_gateway_error(fake_api, status):
+    calls = fake_api(lambda *args: FakeResponse(status))
+    response = request_with_retries(requests.Session(), 'POST', 'https://api.hubapi.com/x', idempotent=False, json={})
+    assert response.status_code == status
+    assert len(calls) == 1
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_create_is_retried_when_turned_away(fake_api, status):
+    responses = [FakeResponse(status, headers={'Retry-After': '1'}), FakeResponse(201, {})]
+    calls = fake_api(lambda *args: responses.pop(0))
+    response = request_with_retries(requests.Session(), 'POST', 'https://api.hubapi.com/x', idempotent=False, json={})
+    assert response.status_code == 201
+    assert len(calls) == 2
+
+def test_create_is_not_resent_after_read_timeout(monkeypatch):
+    calls = []
+    def request(self, method, url, **kwargs):
+        calls.append(url)
+        raise requests.exceptions.ReadTimeout()
+    monkeypatch.setattr(requests.Session, 'request', request)
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        request_with_retries(requests.Session(), 'POST', 'https://api.hubapi.com/x', idempotent=False)
+    assert len(calls) == 1
+
+def test_reads_are_retried_after_server_errors(fake_api):
+    responses = [FakeResponse(502), FakeResponse(500), FakeResponse(200, {})]
+    calls = fake_api(lambda *args: responses.pop(0))
+    assert request_with_retries(requests.Session(), 'GET', 'https://api.hubapi.com/x').status_code == 200
+    assert len(calls) == 3
@@ -0,0 +1,63 @@
+import io
+import json
+import random
+
+import pytest
+
+from json_stream import iter_json_items, open_text, write_json_array
+
+def random_value(rng, depth=0):
+    kinds = ['int', 'float', 'exp', 'string', 'bool', 'null']
+    if depth < 3:
+        kinds += ['list', 'dict']
+    kind = rng.choice(kinds)
+    if kind == 'int':
+        return rng.randint(-10**6, 10**6)
+    if kind == 'float':
+        return round(rng.uniform(-1000, 1000), rng.randint(0, 6))
+    if kind == 'exp':
+        return rng.choice([-2.5e10, 1.5e-7, 6.02e23, -1e-300])
+    if kind == 'string':
+        return ''.join(rng.choice('ab "\\:,]}é\n') for _ in range(rng.randint(0, 8)))
+    if kind == 'bool':
+        return rng.choice([True, False])
+    if kind == 'null':
+        return None
+    if kind == 'list':
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {f"k{i}": random_value(rng, depth + 1) for i in range(rng.randint(0, 4))}
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 64])
+def test_small_chunks_match_json_load(tmp_path, chunk_size):
+    rng = random.Random(chunk_size)
+    for round_number in range(30):
+        document = [random_value(rng) for _ in range(rng.randint(0, 6))]
+        if round_number % 2:
+            document = {f"key{i}": value for i, value in enumerate(document)}
+        path = tmp_path / 'export.json'
+        path.write_text(json.dumps(document, indent=rng.choice([None, 4])), encoding='utf-8')
+
+        with open(path, encoding='utf-8') as file:
+            expected = json.load(file)
+        items = dict(iter_json_items(str(path), chunk_size=chunk_size))
+        assert (list(items.values()) if isinstance(expected, list) else items) == expected
+
+@pytest.mark.parametrize('chunk_size', [1, 3])
+def test_number_split_by_chunk_boundary(tmp_path, chunk_size):
+    path = tmp_path / 'export.json'
+    path.write_text('{"a": -2.5e10, "b": [1.5e-3, 12]}')
+    assert dict(iter_json_items(str(path), chunk_size=chunk_size)) == {'a': -2.5e10, 'b': [1.5e-3, 12]}
+
+def test_gzip_round_trip(tmp_path):
+    path = str(tmp_path / 'export.json.gz')
+    items = [{'name': 'email', 'options': []}, {'name': 'score', 'value': -0.5}]
+    with open_text(path, 'w') as file:
+        write_json_array(file, iter(items))
+    assert [item for _, item in iter_json_items(path, chunk_size=4)] == items
+
+@pytest.mark.parametrize('items', [[], [1], [{'a': [1, 2]}, 'x']])
+def test_write_json_array_matches_json_dump(items):
+    streamed, dumped = io.StringIO(), io.StringIO()
+    write_json_array(streamed, iter(items))
+    json.dump(items, dumped, indent=4)
+    assert streamed.getvalue() == dumped.getvalue()
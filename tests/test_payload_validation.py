@@ -0,0 +1,30 @@
+import pytest
+
+from payload_validation import validate_form
+
+SCHEMA = {
+    'properties': {
+        'email': {'fieldType': 'text'},
+        'country': {'fieldType': 'select'},
+    },
+    'groups': [],
+}
+
+def form_with(field):
+    return {'name': 'Contact us', 'formFieldGroups': [{'fields': [field]}]}
+
+@pytest.mark.parametrize('field', [
+    # Dependent field directly on the field
+    {'name': 'email', 'fieldType': 'text', 'dependentFormField': {'name': 'missing_prop', 'fieldType': 'text'}},
+    # Dependent field inside a dependent field filter
+    {'name': 'email', 'fieldType': 'text', 'dependentFieldFilters': [{'dependentFormField': {'name': 'missing_prop'}}]},
+])
+def test_dependent_field_without_target_property_is_an_error(field):
+    assert validate_form(form_with(field), SCHEMA) == [('error', "field 'missing_prop' has no matching property in the target")]
+
+def test_direct_dependent_field_type_mismatch_is_a_warning():
+    field = {'name': 'email', 'fieldType': 'text', 'dependentFormField': {'name': 'country', 'fieldType': 'radio'}}
+    assert validate_form(form_with(field), SCHEMA) == [('warning', "field 'country' is a radio but the target property is a select")]
+
+def test_matching_form_has_no_issues():
+    assert validate_form(form_with({'name': 'email', 'fieldType': 'text'}), SCHEMA) == []
@@ -0,0 +1,34 @@
+from schema_diff import diff_properties, merge_options
+
+def option(value, label=None, **settings):
+    return {'value': value, 'label': label or value.title(), **settings}
+
+def test_new_and_unchanged_properties():
+    source = [{'name': 'score', 'label': 'Score'}, {'name': 'region', 'label': 'Region'}]
+    target = [{'name': 'region', 'label': 'Region', 'groupName': 'contactinformation'}]
+    creates, updates, identical, protected = diff_properties(source, target)
+    assert [prop['name'] for prop in creates] == ['score']
+    assert (updates, identical, protected) == ([], ['region'], [])
+
+def test_option_patch_keeps_target_only_options():
+    source = [{'name': 'tier', 'options': [option('gold', 'Gold tier'), option('silver')]}]
+    target = [{'name': 'tier', 'options': [option('gold'), option('bronze')]}]
+    _, updates, _, _ = diff_properties(source, target)
+    assert updates == [('tier', {'options': [option('gold', 'Gold tier'), option('bronze'), option('silver')]})]
+
+def test_reordered_options_are_identical():
+    source = [{'name': 'tier', 'options': [option('silver'), option('gold')]}]
+    target = [{'name': 'tier', 'options': [option('gold'), option('silver')]}]
+    assert diff_properties(source, target)[2] == ['tier']
+
+def test_hubspot_defined_properties_are_reported_not_updated():
+    source = [{'name': 'lifecyclestage', 'label': 'Stage', 'options': [option('lead')]}]
+    target = [{'name': 'lifecyclestage', 'label': 'Lifecycle Stage', 'hubspotDefined': True,
+               'options': [option('lead'), option('customer')]}]
+    _, updates, _, protected = diff_properties(source, target)
+    assert updates == []
+    assert protected == [('lifecyclestage', {'label': 'Stage'})]
+
+def test_merge_options_applies_source_settings_by_value():
+    merged = merge_options([option('a', hidden=True)], [option('a', displayOrder=0), option('b', displayOrder=1)])
+    assert merged == [option('a', displayOrder=0, hidden=True), option('b', displayOrder=1)]
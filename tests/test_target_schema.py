@@ -0,0 +1,25 @@
+from conftest import FakeResponse
+from target_schema import fetch_target_schema
+
+def test_dry_run_sees_properties_pushed_since_the_last_one(tmp_path, monkeypatch, fake_api):
+    monkeypatch.chdir(tmp_path)
+    properties = [{'name': 'email', 'type': 'string', 'fieldType': 'text', 'groupName': 'contactinformation'}]
+
+    def handler(method, url, params, headers, json):
+        if url.endswith('/crm/v3/properties/contacts'):
+            etag = f'"{len(properties)}"'
+            if headers.get('If-None-Match') == etag:
+                return FakeResponse(304)
+            return FakeResponse(200, {'results': list(properties)}, {'ETag': etag})
+        return FakeResponse(200, {'results': []})
+    calls = fake_api(handler)
+
+    assert list(fetch_target_schema('key', 'np')['properties']) == ['email']
+
+    # Unchanged pages are revalidated rather than downloaded again
+    calls.clear()
+    assert list(fetch_target_schema('key', 'np')['properties']) == ['email']
+    assert calls[0][3]['If-None-Match'] == '"1"'
+
+    properties.append({'name': 'score', 'type': 'number', 'fieldType': 'number', 'groupName': 'contactinformation'})
+    assert sorted(fetch_target_schema('key', 'np')['properties']) == ['email', 'score']
@@ -0,0 +1,38 @@
+from workflow_plan import plan_workflows
+
+def test_levels_follow_workflow_references():
+    workflows = {
+        '1': {'actions': [{'fields': {'flow_id': '2'}}]},
+        '2': {'actions': []},
+        '3': {'actions': [{'fields': {'flow_id': '1'}}]},
+    }
+    levels, blocked, warnings = plan_workflows(workflows, {})
+    assert levels == [['2'], ['1'], ['3']]
+    assert blocked == {} and warnings == {}
+
+def test_missing_form_blocks_workflow_and_its_dependents():
+    workflows = {
+        '1': {'enrollmentCriteria': {'formId': 'f-missing'}, 'actions': []},
+        '2': {'actions': [{'fields': {'flowId': '1'}}]},
+    }
+    levels, blocked, _ = plan_workflows(workflows, {'form': {'f-other'}})
+    assert levels == []
+    assert blocked['1'] == ['missing form f-missing']
+    assert blocked['2'] == ['depends on blocked workflow 1']
+
+def test_property_not_among_contact_properties_only_warns():
+    # A set-property action on an associated deal; the inventory only knows contact properties
+    workflows = {'1': {'actions': [{'fields': {'property_name': 'dealstage', 'value': 'won'}}]}}
+    levels, blocked, warnings = plan_workflows(workflows, {'property': {'email'}})
+    assert levels == [['1']]
+    assert blocked == {}
+    assert warnings == {'1': ['missing property dealstage']}
+
+def test_cycle_is_blocked():
+    workflows = {
+        '1': {'actions': [{'fields': {'flow_id': '2'}}]},
+        '2': {'actions': [{'fields': {'flow_id': '1'}}]},
+    }
+    levels, blocked, _ = plan_workflows(workflows, {})
+    assert levels == []
+    assert set(blocked) == {'1', '2'}